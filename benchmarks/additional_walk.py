@@ -0,0 +1,64 @@
+''' cost of walking the additional section (_scan_additional) and of
+building every additional field, per report, for each fixture file.
+
+run from the repository root:  python benchmarks/additional_walk.py [files]
+'''
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_report
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+
+
+def load(path):
+  with open(path, encoding='latin-1') as fp:
+    lines = [line.rstrip('\n') for line in fp if len(line) > 10]
+  reports = []
+  for line in lines:
+    try:
+      reports.append(ish_report(lazy=True).loads(line))
+    except Exception:
+      pass
+  return reports
+
+
+def walk(reports):
+  # forget the previous walk, or every run after the first does nothing
+  for report in reports:
+    report._additional_offsets = None
+    report._additional_resume = None
+    report._scan_additional()
+
+
+def build(reports):
+  for report in reports:
+    report._additional = None
+    report.additional()
+
+
+def best_of(func, reports, attempts=5):
+  best = None
+  for attempt in range(attempts):
+    start = time.perf_counter()
+    func(reports)
+    elapsed = time.perf_counter() - start
+    best = min(best or elapsed, elapsed)
+  return best / len(reports) * 1e6
+
+
+def main(*paths):
+  print('%-28s %8s %14s %14s' % ('file', 'reports', 'walk us/rpt', 'build us/rpt'))
+  for path in paths or FIXTURES:
+    reports = load(path)
+    if not reports:
+      continue
+    print('%-28s %8d %14.2f %14.2f' % (os.path.basename(path), len(reports),
+                                        best_of(walk, reports), best_of(build, reports)))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
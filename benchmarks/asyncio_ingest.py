@@ -0,0 +1,65 @@
+''' how long the event loop stalls while a coroutine ingests a file:
+calling ish_parser directly from the coroutine, against aiter_reports
+on the default thread pool and on a process pool. a ticker coroutine
+records the longest gap between its 1 ms sleeps.
+
+run from the repository root:  python benchmarks/asyncio_ingest.py [file]
+'''
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser, aiter_reports
+
+FIXTURE = 'tests/725300-94846-1983'
+
+
+async def ticker(stop, gaps):
+  last = time.perf_counter()
+  while not stop.is_set():
+    await asyncio.sleep(0.001)
+    now = time.perf_counter()
+    gaps.append(now - last)
+    last = now
+
+
+async def blocking(path, executor):
+  return len(list(ish_parser().iter_file(path)))
+
+
+async def asynchronous(path, executor):
+  count = 0
+  async for report in aiter_reports(path, executor):
+    count += 1
+  return count
+
+
+async def measure(ingest, path, executor):
+  stop = asyncio.Event()
+  gaps = []
+  ticking = asyncio.create_task(ticker(stop, gaps))
+  await asyncio.sleep(0.01)
+  start = time.perf_counter()
+  count = await ingest(path, executor)
+  elapsed = time.perf_counter() - start
+  stop.set()
+  await ticking
+  return count, elapsed, max(gaps)
+
+
+def main(path=FIXTURE):
+  print('%s' % path)
+  print('%-22s %8s %10s %14s' % ('ingest', 'reports', 'total ms', 'max stall ms'))
+  with ProcessPoolExecutor() as pool:
+    for (name, ingest, executor) in (('blocking', blocking, None),
+                                     ('aiter_reports thread', asynchronous, None),
+                                     ('aiter_reports process', asynchronous, pool)):
+      (count, elapsed, stall) = asyncio.run(measure(ingest, path, executor))
+      print('%-22s %8d %10.1f %14.1f' % (name, count, elapsed * 1e3, stall * 1e3))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
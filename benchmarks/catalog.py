@@ -0,0 +1,50 @@
+''' nearest-station queries against a catalog the size of the full ISD
+archive: 12k stations spread over the globe, 20 years each. the rows
+are made up, only their positions matter here.
+
+run from the repository root:  python benchmarks/catalog.py
+'''
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser.catalog import ish_catalog, COLUMNS
+
+STATIONS = 12000
+YEARS = range(1995, 2015)
+QUERIES = 200
+
+
+def fake_rows(rng):
+  for number in range(STATIONS):
+    latitude = rng.uniform(-60, 75)
+    longitude = rng.uniform(-180, 180)
+    for year in YEARS:
+      yield ('%06d-%d' % (number, year), 0, 0, '%06d' % number, '99999', year, 0, 0,
+             latitude, longitude, 0, int(latitude // 1), int(longitude // 1),
+             0, '{}', '[]')
+
+
+def main():
+  rng = random.Random(42)
+  with tempfile.TemporaryDirectory() as directory:
+    with ish_catalog(os.path.join(directory, 'catalog.sqlite')) as catalog:
+      with catalog._db:
+        catalog._db.executemany('INSERT INTO files VALUES (%s)' % ', '.join('?' * len(COLUMNS)),
+                                fake_rows(rng))
+
+      points = [(rng.uniform(-60, 75), rng.uniform(-180, 180)) for query in range(QUERIES)]
+      print('%d stations x %d years' % (STATIONS, len(YEARS)))
+      for (k, years) in ((1, None), (5, None), (5, [2010])):
+        start = time.perf_counter()
+        for (latitude, longitude) in points:
+          catalog.nearest(latitude, longitude, k, years)
+        elapsed = (time.perf_counter() - start) / QUERIES
+        print('nearest k=%d years=%-8s %8.2f ms' % (k, years, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,41 @@
+''' the columnar numpy parser against the per-line ish_parser on each of
+the fixtures. both produce the mandatory fields of every record.
+
+run from the repository root:  python benchmarks/columnar.py
+'''
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser, read_columns
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+
+
+def best_of(func, path, attempts=3):
+  best = None
+  for attempt in range(attempts):
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    best = min(best or elapsed, elapsed)
+  return best
+
+
+def per_line(path):
+  for report in ish_parser().iter_file(path):
+    pass
+
+
+def main():
+  print('%-28s %10s %10s %8s' % ('file', 'per-line s', 'columnar s', 'speedup'))
+  for path in FIXTURES:
+    slow = best_of(per_line, path)
+    fast = best_of(read_columns, path)
+    print('%-28s %10.3f %10.4f %8.0f' % (os.path.basename(path), slow, fast, slow / fast))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,68 @@
+''' compare the two ways of parsing a gzipped station-year:
+
+  decompress-then-parse: gzip.open().read(), decode and hand the whole
+                         string to ish_parser.loads (the README recipe)
+  streaming:             ish_parser().iter_file(path) on the .gz itself
+
+run from the repository root:  python benchmarks/compressed_input.py
+'''
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+
+FIXTURES = ['tests/725300.txt',
+            'tests/722540-13904-2014',
+            'tests/725300-94846-1983',
+            'tests/723030-13714-1973',
+            'tests/035480-99999-1943',
+            'tests/010060-99999-2014']
+
+
+def decompress_then_parse(path):
+  with gzip.open(path, 'rb') as fin:
+    content = bytes.decode(fin.read(), 'latin-1')
+  wf = ish_parser()
+  wf.loads(content)
+  return len(wf.get_reports())
+
+
+def streaming(path):
+  return sum(1 for report in ish_parser().iter_file(path))
+
+
+def measure(func, path):
+  tracemalloc.start()
+  start = time.perf_counter()
+  count = func(path)
+  elapsed = time.perf_counter() - start
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return count, elapsed, peak
+
+
+def main():
+  workdir = tempfile.mkdtemp()
+  try:
+    print('%-28s %-22s %8s %9s %10s' % ('file', 'method', 'reports', 'seconds', 'peak MB'))
+    for fixture in FIXTURES:
+      compressed = os.path.join(workdir, os.path.basename(fixture) + '.gz')
+      with open(fixture, 'rb') as src, gzip.open(compressed, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+      for func in (decompress_then_parse, streaming):
+        count, elapsed, peak = measure(func, compressed)
+        print('%-28s %-22s %8d %9.3f %10.1f' % (os.path.basename(fixture),
+              func.__name__, count, elapsed, peak / 1024.0 / 1024.0))
+  finally:
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,56 @@
+''' a station-year to csv: a csv.DictWriter row per observation, the way
+examples/read_chicago.py used to do it, against write_csv with the same
+three columns.
+
+run from the repository root:  python benchmarks/csv_export.py [file]
+'''
+import csv
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+from ish_parser.csv_export import write_csv
+
+FIXTURE = 'tests/725300-94846-1983'
+COLUMNS = [('type', 'report_type'), 'datetime', ('temperature', 'air_temperature:fahrenheit')]
+
+
+def dict_writer(path):
+  fh = io.StringIO()
+  writer = csv.DictWriter(fh, ['type', 'datetime', 'temperature'])
+  writer.writeheader()
+  parser = ish_parser()
+  parser.load(path)
+  for report in parser.get_reports():
+    temperature = report.air_temperature.get_fahrenheit()
+    writer.writerow({'type': report.report_type._obs_value,
+                     'datetime': report.datetime.isoformat(),
+                     'temperature': '' if temperature == 'MISSING' else temperature})
+  return fh.getvalue()
+
+
+def column_spec(path):
+  fh = io.StringIO()
+  write_csv(path, fh, COLUMNS)
+  return fh.getvalue()
+
+
+def main(path=FIXTURE):
+  size = os.path.getsize(path) / 1024.0 / 1024.0
+  print(path)
+  for func in (dict_writer, column_spec):
+    best = None
+    for attempt in range(5):
+      start = time.perf_counter()
+      rows = func(path).count('\n') - 1
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-12s %5d rows %10.1f ms %8.1f MB/s' % (func.__name__, rows, best * 1e3,
+                                                  size / best))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
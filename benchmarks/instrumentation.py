@@ -0,0 +1,46 @@
+''' the cost of parse_stats: a station-year parsed without stats, with
+stats, and with stats decoding (and timing) every component and the
+remarks, followed by the breakdown that last run collected.
+
+run from the repository root:  python benchmarks/instrumentation.py [file]
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser, parse_stats
+
+FIXTURE = 'tests/725300-94846-1983'
+
+
+def without_stats(path):
+  return list(ish_parser().iter_file(path))
+
+
+def with_stats(path):
+  return list(ish_parser(stats=parse_stats()).iter_file(path))
+
+
+def main(path=FIXTURE):
+  print(path)
+  for func in (without_stats, with_stats):
+    best = None
+    for attempt in range(5):
+      start = time.perf_counter()
+      count = len(func(path))
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-14s %5d reports %10.1f ms' % (func.__name__, count, best * 1e3))
+
+  stats = parse_stats(decode_all=True)
+  start = time.perf_counter()
+  list(ish_parser(stats=stats).iter_file(path))
+  print('%-14s %5d reports %10.1f ms' % ('decode_all', stats.reports,
+                                         (time.perf_counter() - start) * 1e3))
+  print()
+  print(stats.summary())
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -0,0 +1,67 @@
+''' time and retained memory of eager reports with every additional field
+decoded, with the shared (interned) report types, directions, cloud
+types and flags against a fresh object for each occurrence. the input
+cycles through all the fixture files, like a multi-year load.
+
+run from the repository root:  python benchmarks/interning.py
+'''
+import glob
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_report
+from ish_parser.Observation import Observation
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+REPORTS = 50000
+
+
+def build(lines):
+  reports = []
+  for line in lines:
+    try:
+      report = ish_report().loads(line)
+    except Exception:
+      continue
+    report.additional()
+    reports.append(report)
+  return reports
+
+
+def measure(lines):
+  start = time.perf_counter()
+  reports = build(lines)
+  elapsed = time.perf_counter() - start
+  del reports
+
+  tracemalloc.start()
+  reports = build(lines)
+  (size, peak) = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return elapsed / len(lines) * 1e6, size / float(len(reports))
+
+
+def main():
+  lines = []
+  for path in FIXTURES:
+    with open(path, encoding='latin-1') as fp:
+      lines.extend(line.rstrip('\n') for line in fp if len(line) > 10)
+  lines = list(itertools.islice(itertools.cycle(lines), REPORTS))
+
+  interned = Observation.__dict__['intern']
+  print('%d reports from %d files' % (REPORTS, len(FIXTURES)))
+  print('%-10s %12s %16s' % ('mode', 'us/report', 'bytes/report'))
+  for mode in ('fresh', 'interned'):
+    if mode == 'fresh':
+      Observation.intern = classmethod(lambda cls, *args: cls(*args))
+    else:
+      Observation.intern = interned
+    print('%-10s %12.1f %16.0f' % ((mode,) + measure(lines)))
+
+
+if __name__ == '__main__':
+  main()
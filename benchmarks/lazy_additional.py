@@ -0,0 +1,45 @@
+''' per-report cost of ish_report.loads when the additional section is
+left alone (temperature-only pipelines) against touching every
+additional field, which is what loads used to do for every line.
+
+run from the repository root:  python benchmarks/lazy_additional.py [file]
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_report
+
+FIXTURE = 'tests/722540-13904-2014'
+
+
+def temperature_only(lines):
+  for line in lines:
+    ish_report().loads(line).air_temperature
+
+
+def every_additional_field(lines):
+  for line in lines:
+    report = ish_report().loads(line)
+    report.air_temperature
+    report.additional()
+
+
+def main(path=FIXTURE):
+  with open(path, encoding='latin-1') as fp:
+    lines = [line.rstrip('\n') for line in fp if len(line) > 10]
+
+  print('%s, %d reports' % (path, len(lines)))
+  for func in (temperature_only, every_additional_field):
+    best = None
+    for attempt in range(3):
+      start = time.perf_counter()
+      func(lines)
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-24s %8.1f us/report' % (func.__name__, best / len(lines) * 1e6))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -0,0 +1,58 @@
+''' allocations and memory of eager against lazy ish_report objects.
+every report reads one field (air_temperature), which is the common
+case for single-variable pipelines. the memory figure is for a list of
+100k reports built by cycling through the fixture lines.
+
+run from the repository root:  python benchmarks/lazy_report.py [file]
+'''
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_report
+
+FIXTURE = 'tests/725300-94846-1983'
+REPORTS = 100000
+
+
+def build(lines, lazy):
+  reports = []
+  for line in lines:
+    report = ish_report(lazy).loads(line)
+    report.air_temperature
+    reports.append(report)
+  return reports
+
+
+def main(path=FIXTURE):
+  with open(path, encoding='latin-1') as fp:
+    lines = [line.rstrip('\n') for line in fp if len(line) > 10]
+  lines = list(itertools.islice(itertools.cycle(lines), REPORTS))
+
+  print('%d reports from %s' % (REPORTS, path))
+  print('%-6s %12s %14s %12s' % ('mode', 'us/report', 'allocs/report', 'MB retained'))
+  for lazy in (False, True):
+    start = time.perf_counter()
+    reports = build(lines, lazy)
+    elapsed = time.perf_counter() - start
+    del reports
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    reports = build(lines, lazy)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del reports
+
+    print('%-6s %12.1f %14.1f %12.1f' % ('lazy' if lazy else 'eager',
+          elapsed / REPORTS * 1e6, blocks / float(REPORTS), size / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -0,0 +1,52 @@
+''' keeping every report of a large file in memory: streamed through
+iter_file (each report holds its line) against iter_mapped (each report
+holds an offset into a memory map). the input is the fixture repeated
+to about 100 MB, written to a temporary file.
+
+run from the repository root:  python benchmarks/mapped_file.py [file]
+'''
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+
+FIXTURE = 'tests/725300-94846-1983'
+SIZE = 100 * 1024 * 1024
+
+
+def measure(read, path):
+  tracemalloc.start()
+  start = time.perf_counter()
+  reports = list(read(path))
+  elapsed = time.perf_counter() - start
+  for report in reports:
+    report.air_temperature
+  (size, peak) = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return len(reports), elapsed, size / 1024.0 / 1024.0
+
+
+def main(path=FIXTURE):
+  with open(path, 'rb') as fp:
+    content = fp.read()
+
+  with tempfile.TemporaryDirectory() as directory:
+    big = os.path.join(directory, 'archive')
+    with open(big, 'wb') as fp:
+      for copy in range(SIZE // len(content) + 1):
+        fp.write(content)
+
+    print('%s repeated to %.0f MB' % (path, os.path.getsize(big) / 1024.0 / 1024.0))
+    print('%-12s %10s %12s %12s' % ('reader', 'reports', 'us/report', 'MB retained'))
+    parser = ish_parser(lazy=True)
+    for read in (parser.iter_file, parser.iter_mapped):
+      (count, elapsed, size) = measure(read, big)
+      print('%-12s %10d %12.2f %12.1f' % (read.__name__, count, elapsed / count * 1e6, size))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
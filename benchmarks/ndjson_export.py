@@ -0,0 +1,52 @@
+''' exporting a station-year as newline delimited json: toJson() per
+report written line by line, against write_ndjson with the json module
+and with orjson.
+
+run from the repository root:  python benchmarks/ndjson_export.py [file]
+'''
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+from ish_parser.ndjson import write_ndjson, orjson
+
+FIXTURE = 'tests/725300-94846-1983'
+
+
+def to_json_per_report(reports, fh):
+  for report in reports:
+    fh.write(report.toJson() + '\n')
+
+
+def ndjson_json(reports, fh):
+  write_ndjson(reports, fh, backend='json')
+
+
+def ndjson_orjson(reports, fh):
+  write_ndjson(reports, fh, backend='orjson')
+
+
+def main(path=FIXTURE):
+  funcs = [to_json_per_report, ndjson_json]
+  if orjson is not None:
+    funcs.append(ndjson_orjson)
+  print(path)
+  for func in funcs:
+    best = None
+    for attempt in range(5):
+      # fresh reports every time, components are decoded on first use
+      reports = list(ish_parser().iter_file(path))
+      fh = io.StringIO()
+      start = time.perf_counter()
+      func(reports, fh)
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-20s %5d reports %10.1f ms %8.1f us/report' % (func.__name__, len(reports),
+                                                         best * 1e3, best * 1e6 / len(reports)))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
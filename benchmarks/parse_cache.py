@@ -0,0 +1,39 @@
+''' reading each fixture through the parse cache: cold (parsed and
+stored) against warm (loaded from the cache), next to an eager
+ish_parser pass for scale.
+
+run from the repository root:  python benchmarks/parse_cache.py
+'''
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser, read_columns
+from ish_parser.cache import parse_cache
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+
+
+def timed(func):
+  start = time.perf_counter()
+  func()
+  return (time.perf_counter() - start) * 1e3
+
+
+def main():
+  with tempfile.TemporaryDirectory() as directory:
+    cache = parse_cache(directory)
+    print('%-24s %12s %10s %10s' % ('file', 'ish_parser', 'cold', 'warm'))
+    for path in FIXTURES:
+      parsed = timed(lambda: list(ish_parser().iter_file(path)))
+      cold = timed(lambda: read_columns(path, cache=cache))
+      warm = min(timed(lambda: read_columns(path, cache=cache)) for attempt in range(5))
+      print('%-24s %9.1f ms %7.1f ms %7.2f ms' % (os.path.basename(path), parsed, cold, warm))
+    print('cache size %.1f MB' % (cache.size() / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+  main()
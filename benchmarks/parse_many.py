@@ -0,0 +1,49 @@
+''' scaling of ish_parser.parse_many with the number of workers. the
+fixtures are replicated into a temporary directory to make a batch of a
+few hundred files, which is then parsed with 1, 2, 4 ... workers up to
+the cpu count.
+
+run from the repository root:  python benchmarks/parse_many.py [copies]
+'''
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import parse_many
+from ish_parser.bulk import count_reports
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+
+
+def main(copies=40):
+  workdir = tempfile.mkdtemp()
+  try:
+    paths = []
+    for copy in range(copies):
+      for fixture in FIXTURES:
+        path = os.path.join(workdir, '%s-%03d' % (os.path.basename(fixture), copy))
+        shutil.copyfile(fixture, path)
+        paths.append(path)
+
+    workers = 1
+    baseline = None
+    print('%d files' % len(paths))
+    print('%8s %9s %12s %8s' % ('workers', 'seconds', 'reports/s', 'speedup'))
+    while workers <= (os.cpu_count() or 1):
+      start = time.perf_counter()
+      reports = sum(result.value for result in parse_many(paths, workers, count_reports))
+      elapsed = time.perf_counter() - start
+      baseline = baseline or elapsed
+      print('%8d %9.2f %12.0f %8.2f' % (workers, elapsed, reports / elapsed,
+                                        baseline / elapsed))
+      workers *= 2
+  finally:
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
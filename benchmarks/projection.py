@@ -0,0 +1,41 @@
+''' a precipitation job (time, air temperature and AA1) over a station
+year: eager loading of everything against loading just those fields.
+
+run from the repository root:  python benchmarks/projection.py [file]
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+
+FIXTURE = 'tests/722540-13904-2014'
+FIELDS = ['datetime', 'air_temperature', 'AA1']
+
+
+def job(parser, path):
+  total = 0.0
+  for report in parser.iter_file(path):
+    report.datetime
+    report.air_temperature
+    precipitation = report.get_additional_field('AA1')
+    if precipitation is not None:
+      total += precipitation.precipitation['depth'].get_numeric()
+  return total
+
+
+def main(path=FIXTURE):
+  print('%s, fields %s' % (path, ', '.join(FIELDS)))
+  for (name, parser) in (('everything', ish_parser()), ('fields', ish_parser(fields=FIELDS))):
+    best = None
+    for attempt in range(3):
+      start = time.perf_counter()
+      job(parser, path)
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-12s %10.1f ms' % (name, best * 1e3))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
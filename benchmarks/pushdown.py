@@ -0,0 +1,42 @@
+''' one day of SY-SA reports out of a station-year: parse everything and
+filter the reports afterwards, against filters checked on the raw line
+before any report is built.
+
+run from the repository root:  python benchmarks/pushdown.py [file]
+'''
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+
+FIXTURE = 'tests/725300-94846-1983'
+START = datetime(1983, 7, 4, tzinfo=timezone.utc)
+END = datetime(1983, 7, 5, tzinfo=timezone.utc)
+
+
+def filter_afterwards(path):
+  return [report for report in ish_parser().iter_file(path)
+          if report.report_type == 'SY-SA' and START <= report.datetime < END]
+
+
+def pushed_down(path):
+  return list(ish_parser(report_types=['SY-SA'], start=START, end=END).iter_file(path))
+
+
+def main(path=FIXTURE):
+  print('%s, SY-SA reports on %s' % (path, START.date()))
+  for func in (filter_afterwards, pushed_down):
+    best = None
+    for attempt in range(3):
+      start = time.perf_counter()
+      count = len(func(path))
+      elapsed = time.perf_counter() - start
+      best = min(best or elapsed, elapsed)
+    print('%-18s %5d reports %10.1f ms' % (func.__name__, count, best * 1e3))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
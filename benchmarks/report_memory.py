@@ -0,0 +1,58 @@
+''' retained bytes per report for each way of loading: eager, lazy,
+lazy through a memory map, and compact. measured for 50k reports
+cycled from the fixture, first as loaded and then after every field,
+additional field and remark has been read once.
+
+run from the repository root:  python benchmarks/report_memory.py [file]
+'''
+import itertools
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+
+FIXTURE = 'tests/725300-94846-1983'
+REPORTS = 50000
+
+MODES = (('eager', dict(), 'iter_file'),
+         ('lazy', dict(lazy=True), 'iter_file'),
+         ('mapped', dict(lazy=True), 'iter_mapped'),
+         ('compact', dict(compact=True), 'iter_file'))
+
+
+def read_everything(reports):
+  for report in reports:
+    for field in report.MANDATORY_FIELDS:
+      getattr(report, field.name)
+    report.additional()
+    report.remarks()
+
+
+def main(path=FIXTURE):
+  with open(path, 'rb') as fp:
+    lines = [line for line in fp if len(line) > 10]
+  lines = list(itertools.islice(itertools.cycle(lines), REPORTS))
+
+  with tempfile.TemporaryDirectory() as directory:
+    data = os.path.join(directory, 'reports')
+    with open(data, 'wb') as fp:
+      fp.writelines(lines)
+
+    print('%d reports from %s' % (REPORTS, path))
+    print('%-8s %14s %14s' % ('mode', 'loaded B/rpt', 'read B/rpt'))
+    for (name, options, reader) in MODES:
+      tracemalloc.start()
+      reports = list(getattr(ish_parser(**options), reader)(data))
+      loaded = tracemalloc.get_traced_memory()[0]
+      read_everything(reports)
+      read = tracemalloc.get_traced_memory()[0]
+      tracemalloc.stop()
+      del reports
+      print('%-8s %14.0f %14.0f' % (name, loaded / float(REPORTS), read / float(REPORTS)))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -0,0 +1,241 @@
+''' the benchmark suite: throughput, memory and allocations of the main
+entry points, on every fixture and on synthetic inputs made by repeating
+a fixture, saved as JSON so two runs (say, before and after a change)
+can be compared.
+
+cases:
+  ish_parser.loads      a whole file through ish_parser().loads
+  ish_report.loads      each line through ish_report().loads
+  component:<Name>      each Components decoder on every field it handles
+  toJson                toJson() of every loaded report
+  get_observations      get_observations() on a loaded parser
+
+every case runs in a fresh interpreter, so peak RSS is its own. time is
+the best of --repeat runs. a separate tracemalloc run gives, per item,
+the memory blocks still held by the case's results (every case returns
+what it built, so they are kept alive until the snapshot) and the peak
+of traced bytes during the call, which includes temporaries.
+
+run from the repository root:
+  python benchmarks/suite.py [--quick] [--scale 20] [-o results.json]
+  python benchmarks/suite.py --compare before.json after.json
+'''
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser, ish_report
+
+try:
+  import resource
+except ImportError:
+  resource = None
+
+FIXTURES = sorted(path for path in glob.glob('tests/[0-9]*') if os.path.isfile(path))
+QUICK_FIXTURE = 'tests/725300.txt'
+SCALED_FIXTURE = 'tests/725300-94846-1983'
+CASES = ('ish_parser.loads', 'ish_report.loads', 'components', 'toJson', 'get_observations')
+
+
+def _peak_rss():
+  ''' peak resident set size of this process in MB, None where unknown '''
+  if resource is None:
+    return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak / 1024.0 / 1024.0 if sys.platform == 'darwin' else peak / 1024.0
+
+
+def _read(path, scale):
+  with open(path, encoding='latin-1') as fp:
+    text = fp.read()
+  if not text.endswith('\n'):
+    text += '\n'
+  return text * scale
+
+
+def _lines(text):
+  return [line for line in text.split('\n') if len(line) >= ish_parser.MIN_LINE_LENGTH]
+
+
+def _loaded(text):
+  parser = ish_parser()
+  parser.loads(text)
+  return parser
+
+
+def _component_inputs(text):
+  ''' the field text of every modelled additional field, by Component class '''
+  inputs = {}
+  for report in _loaded(text).get_reports():
+    for code in report.additional_codes():
+      spec = ish_report.MAP[code]
+      if len(spec) > 2:
+        inputs.setdefault(spec[2].__name__, (spec[2], []))[1].append(
+          report.get_additional_text(code))
+  return inputs
+
+
+def _prepare(case, text):
+  ''' (callable running the case once, number of items it processes) '''
+  if case == 'ish_parser.loads':
+    def parse():
+      parser = ish_parser()
+      parser.loads(text)
+      return parser
+    return parse, len(_lines(text))
+  if case == 'ish_report.loads':
+    lines = _lines(text)
+    def loads():
+      reports = []
+      for line in lines:
+        try:
+          reports.append(ish_report().loads(line))
+        except Exception:
+          pass
+      return reports
+    return loads, len(lines)
+  if case == 'toJson':
+    reports = _loaded(text).get_reports()
+    return (lambda: [report.toJson() for report in reports]), len(reports)
+  if case == 'get_observations':
+    parser = _loaded(text)
+    return parser.get_observations, len(parser.get_reports())
+  if case.startswith('component:'):
+    (component, values) = _component_inputs(text)[case.split(':', 1)[1]]
+    def decode():
+      components = []
+      for value in values:
+        decoded = component()
+        decoded.loads(value)
+        components.append(decoded)
+      return components
+    return decode, len(values)
+  raise KeyError(case)
+
+
+def run_case(case, path, scale, repeat):
+  ''' measure one case in this process, returning its result dict '''
+  text = _read(path, scale)
+  (func, items) = _prepare(case, text)
+  rss_before = _peak_rss()
+
+  best = None
+  for attempt in range(repeat):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    best = min(best or elapsed, elapsed)
+    del result
+
+  # the result stays alive until after the snapshot, so its blocks count
+  tracemalloc.start()
+  before = tracemalloc.take_snapshot()
+  (start_bytes, _) = tracemalloc.get_traced_memory()
+  tracemalloc.reset_peak()
+  result = func()
+  (_, peak_bytes) = tracemalloc.get_traced_memory()
+  after = tracemalloc.take_snapshot()
+  tracemalloc.stop()
+  blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+  del result
+
+  megabytes = len(text.encode('latin-1')) / 1024.0 / 1024.0
+  rss_after = _peak_rss()
+  return {'case': case, 'input': os.path.basename(path), 'scale': scale, 'items': items,
+          'seconds': best, 'items_per_sec': items / best if best else None,
+          'mb_per_sec': megabytes / best if best and case.endswith('loads') else None,
+          'retained_blocks_per_item': blocks / float(items) if items else None,
+          'peak_bytes_per_item': (peak_bytes - start_bytes) / float(items) if items else None,
+          'peak_rss_mb': rss_after,
+          'rss_growth_mb': None if rss_before is None else rss_after - rss_before}
+
+
+def _in_subprocess(case, path, scale, repeat):
+  command = [sys.executable, __file__, '--case', case, '--input', path,
+             '--scale', str(scale), '--repeat', str(repeat)]
+  output = subprocess.run(command, check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL).stdout
+  return json.loads(output)
+
+
+def _cases(path):
+  cases = []
+  for case in CASES:
+    if case == 'components':
+      cases.extend('component:%s' % name for name in sorted(_component_inputs(_read(path, 1))))
+    else:
+      cases.append(case)
+  return cases
+
+
+def run_suite(fixtures, scale, repeat):
+  results = []
+  runs = [(path, 1) for path in fixtures]
+  if scale > 1:
+    runs.append((SCALED_FIXTURE, scale))
+  for (path, times) in runs:
+    for case in _cases(path):
+      if times > 1 and case not in ('ish_parser.loads', 'ish_report.loads'):
+        continue
+      result = _in_subprocess(case, path, times, repeat)
+      results.append(result)
+      sys.stderr.write('%-44s %-24s x%-3d %12.0f items/s\n' % (
+        case, result['input'], times, result['items_per_sec'] or 0))
+  return results
+
+
+def compare(before_path, after_path):
+  ''' print the change in throughput of every case found in both files '''
+  def keyed(path):
+    with open(path) as fp:
+      return dict(((result['case'], result['input'], result['scale']), result)
+                  for result in json.load(fp)['results'])
+  (before, after) = (keyed(before_path), keyed(after_path))
+  print('%-44s %-24s %5s %14s %14s %8s' % ('case', 'input', 'scale', 'before/s',
+                                           'after/s', 'change'))
+  for key in sorted(set(before) & set(after)):
+    (old, new) = (before[key]['items_per_sec'], after[key]['items_per_sec'])
+    print('%-44s %-24s %5d %14.0f %14.0f %+7.1f%%' % (key + (old, new, (new / old - 1) * 100)))
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='ish_parser benchmark suite')
+  parser.add_argument('-o', '--output', help='write the JSON results here (default stdout)')
+  parser.add_argument('--quick', action='store_true', help='only %s' % QUICK_FIXTURE)
+  parser.add_argument('--scale', type=int, default=20,
+                      help='also run the loads cases on %s repeated this often' % SCALED_FIXTURE)
+  parser.add_argument('--repeat', type=int, default=3, help='timed runs per case')
+  parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+  parser.add_argument('--case', help=argparse.SUPPRESS)
+  parser.add_argument('--input', help=argparse.SUPPRESS)
+  args = parser.parse_args(argv)
+
+  if args.compare:
+    compare(*args.compare)
+    return
+  if args.case:
+    print(json.dumps(run_case(args.case, args.input, args.scale, args.repeat)))
+    return
+
+  fixtures = [QUICK_FIXTURE] if args.quick else FIXTURES
+  results = run_suite(fixtures, args.scale, args.repeat)
+  report = {'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'results': results}
+  if args.output:
+    with open(args.output, 'w') as fp:
+      json.dump(report, fp, indent=2)
+  else:
+    json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,61 @@
+''' six hours out of a long time ordered file: a full pass with the time
+filter, read_range bisecting the file, and read_range with an index.
+the input is the fixture repeated with the years shifted forward, so
+it stays in time order, about 190 MB.
+
+run from the repository root:  python benchmarks/time_range.py [file]
+'''
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ish_parser import ish_parser
+from ish_parser.time_index import build_index
+
+FIXTURE = 'tests/725300-94846-1983'
+COPIES = 50
+START = '200507041200'
+END = '200507041800'
+
+
+def best_of(func, attempts=3):
+  best = None
+  for attempt in range(attempts):
+    start = time.perf_counter()
+    count = len(list(func()))
+    elapsed = time.perf_counter() - start
+    best = min(best or elapsed, elapsed)
+  return count, best
+
+
+def main(path=FIXTURE):
+  with open(path, 'rb') as fp:
+    lines = [line for line in fp if len(line) > 10]
+  year = int(lines[0][15:19])
+
+  with tempfile.TemporaryDirectory() as directory:
+    big = os.path.join(directory, 'archive')
+    with open(big, 'wb') as fp:
+      for copy in range(COPIES):
+        shifted = b'%04d' % (year + copy)
+        fp.writelines(line[:15] + shifted + line[19:] for line in lines)
+
+    print('%s shifted over %d years, %.0f MB, %s to %s' % (
+      path, COPIES, os.path.getsize(big) / 1024.0 / 1024.0, START, END))
+    runs = [('full pass', lambda: ish_parser(start=START, end=END).iter_mapped(big)),
+            ('bisect', lambda: ish_parser().read_range(big, START, END))]
+    for (name, func) in runs:
+      (count, elapsed) = best_of(func)
+      print('%-12s %5d reports %10.2f ms' % (name, count, elapsed * 1e3))
+
+    start = time.perf_counter()
+    build_index(big, every=100)
+    print('%-12s %24.2f ms' % ('build index', (time.perf_counter() - start) * 1e3))
+    (count, elapsed) = best_of(lambda: ish_parser().read_range(big, START, END))
+    print('%-12s %5d reports %10.2f ms' % ('index', count, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -1,17 +1,10 @@
-import csv
-from src.WeatherFile import WeatherFile
+from ish_parser import ish_parser, write_csv
 
 file = '725300.txt'
 output = 'results.csv'
 
-output_fh = open(output, 'wb')
-csvwriter = csv.DictWriter(output_fh, ['type', 'datetime', 'temperature'])
+# observations only (no summary of day reports), temperature in fahrenheit
+columns = [('type', 'report_type'), 'datetime', ('temperature', 'air_temperature:fahrenheit')]
 
-with open(file) as fp:
-  content = fp.read()
-wf = WeatherFile()
-wf.loads(content)
-for report in wf.get_observations():
-  if report.air_temperature.get_fahrenheit() != 'MISSING':
-    csvwriter.writerow({'type': report.report_type, 'datetime': report.datetime.isoformat(), 
-                        'temperature': report.air_temperature.get_fahrenheit()})
+with open(output, 'w', newline='') as output_fh:
+  write_csv(file, output_fh, columns, report_types=ish_parser.OBS_TYPES)
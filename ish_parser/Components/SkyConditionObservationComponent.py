@@ -5,9 +5,9 @@ class SkyConditionObservationComponent(BaseComponent):
   ''' handler for GF1 data type '''
 
   def loads(self, string):
-    self.sky_condition_observation = {'total_coverage': CloudCoverage(string[0:2],
+    self.sky_condition_observation = {'total_coverage': CloudCoverage.intern(string[0:2],
                                                         CloudCoverage.OKTA, string[3:4]),
-                                      'total_lowest_coverage': CloudCoverage(string[5:7],
+                                      'total_lowest_coverage': CloudCoverage.intern(string[5:7],
                                                                CloudCoverage.OKTA, string[7:8])}
 
   def __repr__(self):
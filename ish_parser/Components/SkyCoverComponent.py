@@ -35,11 +35,11 @@ class SkyCoverComponent(BaseComponent):
   
   def loads(self, string):
     self.sky_cover = {
-      'coverage': CloudCoverage(string[0:2],
+      'coverage': CloudCoverage.intern(string[0:2],
         CloudCoverage.OKTA, string[2:3]),
       'base_height': Distance(int(string[4:9]),
         Distance.METERS, string[9:10]),
-      'cloud_type': Constant(string[9:11], None, 
+      'cloud_type': Constant.intern(string[9:11], None, 
         string[11:12], self.CLOUD_TYPES)}
 
   def __repr__(self):
@@ -56,15 +56,15 @@ class SkyCoverSummationComponent(BaseComponent):
   def loads(self, string):
 
     self.sky_cover_summation  = {
-      'coverage': Constant(string[0:1], None,
+      'coverage': Constant.intern(string[0:1], None,
         string[3:4], self.CLOUD_TYPES),
-      'coverage_simple': Constant(string[0:1], None,
+      'coverage_simple': Constant.intern(string[0:1], None,
         string[3:4], self.CLOUD_TYPES_SIMPLE),
-      'secondary_coverage': Constant(string[1:3], None,
+      'secondary_coverage': Constant.intern(string[1:3], None,
         string[3:4], self.SECONDARY_TYPES),
       'height': Distance(int(string[4:10]),
         Distance.METERS, string[10:11]),
-      'characteristic': Constant(string[11:12], None, 
+      'characteristic': Constant.intern(string[11:12], None, 
         None, self.CHARACTERISTIC)}
 
   def __str__(self):
@@ -22,13 +22,13 @@ class SolarIrradianceComponent(BaseComponent):
   def loads(self, string):
     self.solar_irradiance = {'time_period': Minutes(string[0:4]),
                              'global_irradiance': Irradiance(string[4:8]),
-                             'irradiance_data_flag': Constant(string[8:10], None, 
+                             'irradiance_data_flag': Constant.intern(string[8:10], None, 
                                                      string[10:11], self.DATA_FLAGS),
                              'direct_beam_irradiance': Irradiance(string[11:15]),
-                             'direct_beam_irradiance_data_flag': Constant(string[15:17], None,
+                             'direct_beam_irradiance_data_flag': Constant.intern(string[15:17], None,
                                                                  string[17:18], self.DATA_FLAGS),
                              'diffuse_irradiance': Irradiance(string[18:22]),
-                             'diffuse_irradiance_data_flag': Constant(string[22:24], None,
+                             'diffuse_irradiance_data_flag': Constant.intern(string[22:24], None,
                                                              string[24:25], self.DATA_FLAGS),
                              'uvb_global_irradiance': Irradiance(string[26:30])}
 
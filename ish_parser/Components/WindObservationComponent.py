@@ -20,7 +20,7 @@ class WindObservationComponent(BaseComponent):
       'type': self.WIND_OBSERVATION_TYPES[string[0:1]],
       'hours': int(string[1:3]),
       'speed': Speed(float(string[3:7]) / 10.0, Speed.METERSPERSECOND, string[7:8]),
-      'direction': Direction(string[8:11], Direction.RADIANS)
+      'direction': Direction.intern(string[8:11], Direction.RADIANS)
     }
 
   def toJson(self):
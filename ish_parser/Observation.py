@@ -1,4 +1,11 @@
 import json
+from collections import OrderedDict
+
+# shared instances handed out by Observation.intern, oldest evicted first
+INTERN_SIZE = 4096
+_interned = OrderedDict()
+
+
 class ObservationException(BaseException):
   ''' base exception handling class for  ish_observations'''
 
@@ -12,6 +19,20 @@ class Observation(object):
     self._obs_quality = obs_quality
     self._obs_index = obs_index
 
+  @classmethod
+  def intern(cls, obs_value, obs_units='', obs_quality='', obs_index=None):
+    ''' like calling the class, but identical observations share one
+    instance. only for values that repeat a lot (report types, flags,
+    cloud types..), and the instance must never be modified '''
+    key = (cls, obs_value, obs_units, obs_quality, id(obs_index))
+    obs = _interned.get(key)
+    if obs is None or obs._obs_index is not obs_index:
+      obs = cls(obs_value, obs_units, obs_quality, obs_index)
+      if len(_interned) >= INTERN_SIZE:
+        _interned.popitem(last=False)
+      _interned[key] = obs
+    return obs
+
   def __repr__(self):
     return str(self._obs_value)
 
@@ -1,3 +1,5 @@
+import importlib
+
 from .ish_report import ish_report, ish_reportException
 from .Speed import Speed
 from .Observation import Observation, ObservationException
@@ -13,3 +15,33 @@ from .CloudCoverage import CloudCoverage
 from .Constant import Constant
 from .Minutes import Minutes
 from .Irradiance import Irradiance
+from .ish_file import open_ish
+from .filters import line_filter
+from .stats import parse_stats
+from .quarantine import quarantine, ErrorBudgetExceeded
+
+# these pull in numpy, multiprocessing, sqlite3 or asyncio, so they are
+# imported the first time one of their names is used. that keeps
+# `import ish_parser`, and with it the ish command, quick to start
+_LAZY = {'read_columns': 'columnar',
+         'loads_columns': 'columnar',
+         'parse_many': 'bulk',
+         'ParseResult': 'bulk',
+         'ish_catalog': 'catalog',
+         'aiter_reports': 'aio',
+         'gather_files': 'aio',
+         'write_ndjson': 'ndjson',
+         'write_csv': 'csv_export'}
+
+
+def __getattr__(name):
+  module = _LAZY.get(name)
+  if module is None:
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+  value = getattr(importlib.import_module('.' + module, __name__), name)
+  globals()[name] = value
+  return value
+
+
+def __dir__():
+  return sorted(set(globals()) | set(_LAZY))
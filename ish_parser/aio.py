@@ -0,0 +1,103 @@
+''' asyncio front end, so a service running an event loop can ingest ish
+files without stalling it.
+
+reading (and inflating) happens on a thread, batches of lines are parsed
+on an executor, the loop itself only hands over batches and yields the
+reports. the next batch is read while the current one is parsed. with a
+ProcessPoolExecutor parsing runs in parallel with the loop, on the
+default thread pool it still keeps the loop responsive but shares the
+interpreter lock with it.
+'''
+import asyncio
+import contextlib
+import functools
+import itertools
+
+from .bulk import parse_file
+from .ish_file import open_ish
+from .ish_parser import ish_parser
+from .quarantine import quarantine
+
+BATCH_SIZE = 2000
+
+
+def parse_batch(lines, options, source=None, offset=0):
+  ''' parse a list of lines into (list of reports, list of
+  quarantine.rejected_line for the lines that failed to load). offset is
+  where the first line starts in source. a module level function, and
+  the rejected lines are handed back rather than kept on a quarantine,
+  so batches can go to a process pool '''
+  errors = quarantine(max_lines=len(lines))
+  reports = list(ish_parser(errors=errors, **options).iter_reports(lines, source))
+  return reports, [line._replace(offset=offset + line.offset) for line in errors.lines]
+
+
+class _line_batches(object):
+  ''' lines of a file handed out a batch at a time, meant to be driven
+  from a worker thread, along with where each batch starts. the file is
+  opened on the first batch '''
+
+  def __init__(self, path_or_fileobj, batch_size):
+    self._source = path_or_fileobj
+    self._batch_size = batch_size
+    self._stack = contextlib.ExitStack()
+    self._fp = None
+    self._offset = 0
+
+  def next_batch(self):
+    ''' (offset of the first line, lines), lines include their endings so
+    offsets are in bytes (see ish_file.open_ish) '''
+    if self._fp is None:
+      self._fp = self._stack.enter_context(open_ish(self._source))
+    lines = list(itertools.islice(self._fp, self._batch_size))
+    offset = self._offset
+    self._offset += sum(map(len, lines))
+    return offset, lines
+
+  def close(self):
+    self._stack.close()
+
+
+async def aiter_reports(path_or_fileobj, executor=None, batch_size=BATCH_SIZE, errors=None,
+                        **options):
+  ''' async iterator over the reports of a file (path or file object, plain
+  or compressed), for use as  async for report in aiter_reports(path).
+  batches of batch_size lines are parsed on executor (the loop's default
+  executor if None). lines that fail to load go to errors, one
+  quarantine for the whole file, with the file and their offset in it
+  (see ish_parser). other keyword arguments are ish_parser options '''
+  loop = asyncio.get_running_loop()
+  errors = quarantine() if errors is None else errors
+  source = path_or_fileobj
+  if hasattr(source, 'read'):
+    source = getattr(source, 'name', None)
+  batches = _line_batches(path_or_fileobj, batch_size)
+  try:
+    (offset, lines) = await loop.run_in_executor(None, batches.next_batch)
+    while lines:
+      parsing = loop.run_in_executor(executor, parse_batch, lines, options, source, offset)
+      (offset, lines) = await loop.run_in_executor(None, batches.next_batch)
+      (reports, rejected) = await parsing
+      for line in rejected:
+        errors.add(*line)
+      for report in reports:
+        yield report
+  finally:
+    await loop.run_in_executor(None, batches.close)
+
+
+async def gather_files(paths, limit=4, func=list, executor=None, **options):
+  ''' parse many files with at most limit of them in flight at once, and
+  return a bulk.ParseResult per path, in the order of paths. func reduces
+  the reports of each file on the executor (it must be picklable for a
+  process pool), a failed file is recorded on its result rather than
+  raised. other keyword arguments are ish_parser options '''
+  loop = asyncio.get_running_loop()
+  semaphore = asyncio.Semaphore(limit)
+
+  async def parse(path):
+    async with semaphore:
+      return await loop.run_in_executor(
+        executor, functools.partial(parse_file, path, func, **options))
+
+  return await asyncio.gather(*(parse(path) for path in paths))
@@ -0,0 +1,163 @@
+''' parse many station-year files at once on a pool of processes '''
+import argparse
+import collections
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from .ish_parser import ish_parser
+
+
+class ParseResult(object):
+  ''' the outcome of parsing one file in a batch. value holds whatever
+  the reducing function returned, error a description when the file
+  could not be read at all '''
+
+  def __init__(self, path, value=None, error=None, seconds=0.0):
+    self.path = path
+    self.value = value
+    self.error = error
+    self.seconds = seconds
+
+  @property
+  def ok(self):
+    return self.error is None
+
+  def __repr__(self):
+    if self.ok:
+      return '<ParseResult %s ok>' % self.path
+    return '<ParseResult %s error=%s>' % (self.path, self.error)
+
+
+def count_reports(reports):
+  ''' reducing function that only counts, handy when the caller wants
+  throughput and not the reports themselves '''
+  return sum(1 for report in reports)
+
+
+def parse_file(path, func=list, **options):
+  ''' parse one file and reduce its reports with func. options go to
+  ish_parser (lazy, fields, filters..). never raises for a bad file, the
+  failure is recorded on the result instead '''
+  start = time.time()
+  try:
+    value = func(ish_parser(**options).iter_file(path))
+  except Exception as exp:
+    logging.warning('unable to parse %s, error: %s' % (path, exp))
+    return ParseResult(path, error='%s: %s' % (type(exp).__name__, exp),
+                       seconds=time.time() - start)
+  return ParseResult(path, value, seconds=time.time() - start)
+
+
+def expand_paths(paths):
+  ''' turn a mix of files, globs and directories into a sorted list of
+  files. directories are walked recursively '''
+  expanded = []
+  for path in paths:
+    if os.path.isdir(path):
+      for (root, dirs, files) in os.walk(path):
+        dirs.sort()
+        expanded.extend(os.path.join(root, name) for name in sorted(files)
+                        if not name.startswith('.'))
+    elif glob.has_magic(path):
+      expanded.extend(sorted(glob.glob(path)))
+    else:
+      expanded.append(path)
+  return expanded
+
+
+def _largest_first(paths):
+  ''' indices of paths ordered by file size, biggest first, so the long
+  files start early and don't end up as the tail of the batch '''
+  def size(index):
+    try:
+      return os.path.getsize(paths[index])
+    except OSError:
+      return 0
+  return sorted(range(len(paths)), key=size, reverse=True)
+
+
+def parse_many(paths, workers=None, func=list, ordered=True, **options):
+  ''' parse every file in paths on a pool of worker processes, yielding a
+  ParseResult per file. func reduces the report stream of a file inside
+  the worker (it must be picklable, i.e. a module level function), so
+  only its return value travels back. files are scheduled largest first.
+  results come back in the order of paths, unless ordered is False, in
+  which case they are yielded as soon as they finish. at most two files
+  per worker are in flight or waiting for their turn to be yielded, so a
+  batch is streamed rather than held in memory; when the next file due
+  is still queued behind bigger ones it is started anyway. workers
+  defaults to the number of cpus, 1 parses in this process. any other
+  keyword arguments are ish_parser options for every file '''
+  paths = list(paths)
+  if workers is None:
+    workers = os.cpu_count() or 1
+
+  if workers <= 1:
+    for path in paths:
+      yield parse_file(path, func, **options)
+    return
+
+  # multiprocessing is only loaded when there is a pool to run
+  from concurrent.futures import ProcessPoolExecutor
+  queued = collections.deque(_largest_first(paths))
+  limit = 2 * workers
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    running = {}
+    # ordered results that finished before the ones in front of them
+    finished = {}
+    submitted = set()
+
+    def submit(index):
+      submitted.add(index)
+      running[pool.submit(parse_file, paths[index], func, **options)] = index
+
+    due = 0
+    while running or queued:
+      while queued and len(running) + len(finished) < limit:
+        index = queued.popleft()
+        if index not in submitted:
+          submit(index)
+      if ordered and due < len(paths) and due not in submitted:
+        submit(due)
+      if not running:
+        continue
+      (done, _) = wait(running, return_when=FIRST_COMPLETED)
+      for future in done:
+        index = running.pop(future)
+        if ordered:
+          finished[index] = future.result()
+        else:
+          yield future.result()
+      while due in finished:
+        yield finished.pop(due)
+        due += 1
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='parse many ish files in parallel')
+  parser.add_argument('paths', nargs='+', help='files, globs or directories')
+  parser.add_argument('-j', '--workers', type=int, default=None,
+                      help='worker processes (default: one per cpu)')
+  args = parser.parse_args(argv)
+
+  failures = 0
+  total = 0
+  start = time.time()
+  for result in parse_many(expand_paths(args.paths), args.workers, count_reports):
+    if result.ok:
+      total += result.value
+      print('%s\t%d\t%.2fs' % (result.path, result.value, result.seconds))
+    else:
+      failures += 1
+      print('%s\tERROR\t%s' % (result.path, result.error))
+  sys.stderr.write('%d reports, %d failed files, %.1fs\n' % (total, failures,
+                                                            time.time() - start))
+  return 1 if failures else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,144 @@
+''' an on-disk cache of parsed files, so station-years that don't change
+are not parsed again on every run.
+
+an entry holds the columns read_columns decodes plus the text after the
+fixed width part of each record (the additional section and remarks),
+as one byte blob with offsets into it, saved as an uncompressed .npz.
+entries are named after the blake2b hash of the file content and
+CACHE_VERSION, so a touched but unchanged file still hits. a small
+.ref file per (path, size, mtime) remembers that hash, so the usual
+warm lookup does not read the file at all.
+
+once the entries add up to more than max_bytes, the least recently
+used are removed.
+'''
+import hashlib
+import os
+
+from .columnar import np, _require_numpy, loads_columns, PREAMBLE_LENGTH, ZERO
+from .ish_file import ENCODING, open_binary
+
+# bump whenever the layout of an entry changes
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+ENTRY_SUFFIX = '.npz'
+REF_SUFFIX = '.ref'
+
+
+def _tails(buf, offsets):
+  ''' the text after the preamble of every record at offsets, as one blob
+  and n + 1 offsets into it '''
+  heads = buf[offsets[:, None] + np.arange(4)].astype(np.int64) - ZERO
+  lengths = heads @ np.array([1000, 100, 10, 1], dtype=np.int64)
+  starts = offsets + PREAMBLE_LENGTH
+  bounds = np.zeros(len(offsets) + 1, dtype=np.int64)
+  np.cumsum(lengths, out=bounds[1:])
+  if not len(offsets):
+    return np.zeros(0, dtype=np.uint8), bounds
+  index = np.repeat(starts - bounds[:-1], lengths) + np.arange(bounds[-1])
+  return buf[index], bounds
+
+
+def additional_text(columns, row):
+  ''' the additional section and remarks of one record of a cached entry,
+  as the text that follows the fixed width part of the line '''
+  (start, stop) = columns['additional_offsets'][row:row + 2]
+  return columns['additional_data'][start:stop].tobytes().decode(ENCODING)
+
+
+class parse_cache(object):
+  ''' the cache kept in directory, created if need be '''
+
+  def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+    _require_numpy()
+    self.directory = directory
+    self.max_bytes = max_bytes
+    os.makedirs(directory, exist_ok=True)
+
+  def _ref_path(self, path):
+    stat = os.stat(path)
+    key = '%s\0%d\0%d\0%d' % (os.path.realpath(path), stat.st_size, stat.st_mtime_ns,
+                              CACHE_VERSION)
+    return os.path.join(self.directory,
+                        hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + REF_SUFFIX)
+
+  def _entry_path(self, content_hash):
+    return os.path.join(self.directory, '%s-v%d%s' % (content_hash, CACHE_VERSION,
+                                                      ENTRY_SUFFIX))
+
+  def read_columns(self, path):
+    ''' the columns of path (see columnar.read_columns) plus
+    additional_data and additional_offsets, from the cache when the file
+    was seen before, parsed and stored otherwise '''
+    ref_path = self._ref_path(path)
+    entry_path = None
+    try:
+      with open(ref_path) as fp:
+        entry_path = self._entry_path(fp.read().strip())
+    except FileNotFoundError:
+      pass
+
+    if entry_path is not None and os.path.exists(entry_path):
+      return self._load(entry_path)
+
+    with open_binary(path) as fp:
+      data = fp.read()
+    content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    entry_path = self._entry_path(content_hash)
+    with open(ref_path, 'w') as fp:
+      fp.write(content_hash)
+    if os.path.exists(entry_path):
+      return self._load(entry_path)
+
+    columns = loads_columns(data)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    (columns['additional_data'], columns['additional_offsets']) = _tails(buf, columns['offset'])
+    self._store(entry_path, columns)
+    return columns
+
+  def _load(self, entry_path):
+    os.utime(entry_path)
+    with np.load(entry_path) as entry:
+      return dict((name, entry[name]) for name in entry.files)
+
+  def _store(self, entry_path, columns):
+    partial = entry_path + '.partial'
+    with open(partial, 'wb') as fp:
+      np.savez(fp, **columns)
+    os.replace(partial, entry_path)
+    self.evict()
+
+  def size(self):
+    ''' bytes taken by the cached entries '''
+    return sum(os.path.getsize(os.path.join(self.directory, name))
+               for name in os.listdir(self.directory) if name.endswith(ENTRY_SUFFIX))
+
+  def evict(self):
+    ''' remove the least recently used entries until they fit in
+    max_bytes, along with refs that no longer lead anywhere '''
+    entries = []
+    for name in os.listdir(self.directory):
+      if name.endswith(ENTRY_SUFFIX):
+        stat = os.stat(os.path.join(self.directory, name))
+        entries.append((stat.st_mtime_ns, stat.st_size, name))
+    total = sum(size for (used, size, name) in entries)
+    if total <= self.max_bytes:
+      return
+    for (used, size, name) in sorted(entries):
+      if total <= self.max_bytes:
+        break
+      os.remove(os.path.join(self.directory, name))
+      total -= size
+
+    for name in os.listdir(self.directory):
+      if name.endswith(REF_SUFFIX):
+        ref_path = os.path.join(self.directory, name)
+        with open(ref_path) as fp:
+          if not os.path.exists(self._entry_path(fp.read().strip())):
+            os.remove(ref_path)
+
+  def clear(self):
+    ''' remove every entry and ref '''
+    for name in os.listdir(self.directory):
+      if name.endswith(ENTRY_SUFFIX) or name.endswith(REF_SUFFIX):
+        os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,239 @@
+''' a catalog of the ish files under a directory tree, kept in sqlite.
+
+every file is read once (on a pool of processes, see bulk.parse_many)
+and summarised into one row: station, wban, year, first and last time,
+position, report count, a histogram of report types and the additional
+codes that occur. files whose size and mtime did not change since they
+were catalogued are skipped on the next build.
+
+positions are also stored as 1 degree grid cells with an index on them,
+so nearest() only looks at the files in a box around the point, grown
+until it holds k stations, instead of at the whole table.
+'''
+import json
+import math
+import os
+import sqlite3
+from collections import Counter
+
+from .bulk import expand_paths, parse_many
+from .timestamp import to_datetime
+
+EARTH_RADIUS = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+  path TEXT PRIMARY KEY,
+  size INTEGER,
+  mtime_ns INTEGER,
+  station TEXT,
+  wban TEXT,
+  year INTEGER,
+  first_time INTEGER,
+  last_time INTEGER,
+  latitude REAL,
+  longitude REAL,
+  elevation INTEGER,
+  grid_lat INTEGER,
+  grid_lon INTEGER,
+  reports INTEGER,
+  report_types TEXT,
+  codes TEXT
+);
+CREATE INDEX IF NOT EXISTS files_grid ON files (grid_lat, grid_lon);
+CREATE INDEX IF NOT EXISTS files_station ON files (station, wban);
+'''
+
+COLUMNS = ('path', 'size', 'mtime_ns', 'station', 'wban', 'year', 'first_time',
+           'last_time', 'latitude', 'longitude', 'elevation', 'grid_lat', 'grid_lon',
+           'reports', 'report_types', 'codes')
+
+
+def distance(lat1, lon1, lat2, lon2):
+  ''' great circle distance in km '''
+  (lat1, lon1, lat2, lon2) = map(math.radians, (lat1, lon1, lat2, lon2))
+  a = (math.sin((lat2 - lat1) / 2) ** 2 +
+       math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+  return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _report_fields(report):
+  ''' what summarize needs of one report, decoded up front so a lazy
+  report that turns out to be bad fails before anything is counted '''
+  return ((report.weather_station, report.wban),
+          (report.latitude, report.longitude, report.elevation),
+          report.report_type._obs_value, report.additional_codes(), report.timestamp)
+
+
+def summarize(reports):
+  ''' reduce the reports of one file to its catalog entry. a module level
+  function so parse_many can run it in the workers. reports are read
+  lazily, so a line the parser would have rejected (an unknown additional
+  code..) only fails here. it is left out and counted as rejected '''
+  stations = Counter()
+  positions = Counter()
+  report_types = Counter()
+  codes = set()
+  rejected = 0
+  (first, last) = (None, None)
+  for report in reports:
+    try:
+      (station, position, report_type, report_codes, timestamp) = _report_fields(report)
+    except Exception:
+      rejected += 1
+      continue
+    stations[station] += 1
+    positions[position] += 1
+    report_types[report_type] += 1
+    codes.update(report_codes)
+    first = timestamp if first is None else min(first, timestamp)
+    last = timestamp if last is None else max(last, timestamp)
+
+  if not stations:
+    return None
+  ((station, wban), count) = stations.most_common(1)[0]
+  (latitude, longitude, elevation) = positions.most_common(1)[0][0]
+  return {'station': station, 'wban': wban, 'first_time': first, 'last_time': last,
+          'latitude': latitude, 'longitude': longitude, 'elevation': elevation,
+          'reports': sum(report_types.values()), 'report_types': dict(report_types),
+          'codes': sorted(codes), 'rejected': rejected}
+
+
+class ish_catalog(object):
+  ''' the catalog database at path, created if it does not exist. use as
+  a context manager or call close() '''
+
+  def __init__(self, path):
+    self.path = path
+    self._db = sqlite3.connect(path)
+    self._db.row_factory = sqlite3.Row
+    self._db.executescript(SCHEMA)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def close(self):
+    self._db.close()
+
+  def build(self, paths, workers=None):
+    ''' catalog every file under paths (files, globs or directories).
+    unchanged files are skipped, files that can't be read are logged and
+    left out. returns the number of files (re)catalogued '''
+    known = dict((row['path'], (row['size'], row['mtime_ns']))
+                 for row in self._db.execute('SELECT path, size, mtime_ns FROM files'))
+    todo = {}
+    for path in expand_paths(paths):
+      if path.endswith('.idx') or path == self.path:
+        continue
+      stat = os.stat(path)
+      if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+        todo[path] = stat
+
+    count = 0
+    with self._db:
+      for result in parse_many(list(todo), workers, summarize, lazy=True):
+        if not result.ok or result.value is None:
+          continue
+        stat = todo[result.path]
+        self._db.execute('INSERT OR REPLACE INTO files VALUES (%s)' % ', '.join('?' * len(COLUMNS)),
+                         self._row(result.path, stat, result.value))
+        count += 1
+    return count
+
+  def _row(self, path, stat, summary):
+    year = to_datetime(summary['first_time']).year
+    return (path, stat.st_size, stat.st_mtime_ns, summary['station'], summary['wban'],
+            year, summary['first_time'], summary['last_time'], summary['latitude'],
+            summary['longitude'], summary['elevation'],
+            int(math.floor(summary['latitude'])), int(math.floor(summary['longitude'])),
+            summary['reports'], json.dumps(summary['report_types'], sort_keys=True),
+            json.dumps(summary['codes']))
+
+  def files(self, station=None, wban=None, year=None):
+    ''' catalog entries (dicts), optionally for one station and year '''
+    (where, arguments) = ([], [])
+    for (column, value) in (('station', station), ('wban', wban), ('year', year)):
+      if value is not None:
+        where.append('%s = ?' % column)
+        arguments.append(value)
+    sql = 'SELECT * FROM files'
+    if where:
+      sql += ' WHERE ' + ' AND '.join(where)
+    return [_entry(row) for row in self._db.execute(sql + ' ORDER BY path', arguments)]
+
+  def nearest(self, latitude, longitude, k=5, years=None):
+    ''' the k stations closest to a point, nearest first, as dicts with
+    station, wban, latitude, longitude, elevation, distance (km) and the
+    catalogued files. years limits the search to stations with files for
+    any of those years, and the files listed to those years '''
+    radius = 0
+    while True:
+      stations = self._stations_in_box(latitude, longitude, radius, years)
+      if len(stations) >= k or radius >= 180:
+        break
+      radius = max(1, radius * 2)
+
+    if stations:
+      # everything within the kth distance, which the grown box may not cover
+      ranked = sorted(stations.values(), key=lambda station: station['distance'])
+      reach = ranked[min(k, len(ranked)) - 1]['distance']
+      stations = self._stations_in_box(latitude, longitude,
+                                       reach / KM_PER_DEGREE + 1, years)
+    return sorted(stations.values(), key=lambda station: station['distance'])[:k]
+
+  def _stations_in_box(self, latitude, longitude, radius, years):
+    ''' stations with files in the grid cells within radius degrees of
+    the point, longitude widened for the latitude '''
+    cell_lat = int(math.floor(latitude))
+    cell_lon = int(math.floor(longitude))
+    where = ['grid_lat BETWEEN ? AND ?']
+    arguments = [cell_lat - int(math.ceil(radius)), cell_lat + int(math.ceil(radius))]
+
+    poleward = min(89.9, abs(latitude) + radius)
+    lon_radius = radius / math.cos(math.radians(poleward))
+    if lon_radius < 180:
+      low = cell_lon - int(math.ceil(lon_radius))
+      high = cell_lon + int(math.ceil(lon_radius))
+      if low < -180 or high > 179:
+        # the box crosses the antimeridian
+        where.append('(grid_lon >= ? OR grid_lon <= ?)')
+        arguments += [(low + 180) % 360 - 180, (high + 180) % 360 - 180]
+      else:
+        where.append('grid_lon BETWEEN ? AND ?')
+        arguments += [low, high]
+    if years is not None:
+      years = list(years)
+      where.append('year IN (%s)' % ', '.join('?' * len(years)))
+      arguments += years
+
+    stations = {}
+    sql = 'SELECT * FROM files WHERE %s ORDER BY path' % ' AND '.join(where)
+    for row in self._db.execute(sql, arguments):
+      key = (row['station'], row['wban'])
+      if key not in stations:
+        stations[key] = {'station': row['station'], 'wban': row['wban'],
+                         'latitude': row['latitude'], 'longitude': row['longitude'],
+                         'elevation': row['elevation'],
+                         'distance': distance(latitude, longitude,
+                                              row['latitude'], row['longitude']),
+                         'files': []}
+      stations[key]['files'].append(row['path'])
+    return stations
+
+
+def _entry(row):
+  entry = dict(row)
+  entry['report_types'] = json.loads(entry['report_types'])
+  entry['codes'] = json.loads(entry['codes'])
+  return entry
+
+
+def build_catalog(database, paths, workers=None):
+  ''' create or update the catalog at database with the files under paths,
+  returns the number of files catalogued '''
+  with ish_catalog(database) as catalog:
+    return catalog.build(paths, workers)
@@ -0,0 +1,334 @@
+''' the ish command.
+
+  ish convert PATH.. [--format csv|ndjson|parquet] [-o OUTPUT]
+  ish filter PATH..   the raw lines that pass the filters
+  ish stats PATH..    station, time span and report counts per file
+  ish index PATH..    write time index sidecars (see time_index)
+
+paths are files (plain or compressed), globs or directories, or - for
+standard input. every command takes the same filters: --start, --end,
+--report-type, --station and --box. --jobs parses files on that many
+processes, --progress reports each file and the throughput on stderr.
+
+only what a command needs is imported, so the command starts quickly
+enough to run once per file from a shell loop.
+'''
+import argparse
+import functools
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from .ish_file import open_binary
+from .filters import line_filter
+
+FORMATS = ('csv', 'ndjson', 'parquet')
+TIME_FORMATS = {4: '%Y', 6: '%Y%m', 8: '%Y%m%d', 10: '%Y%m%d%H', 12: '%Y%m%d%H%M'}
+STDIN = '-'
+
+
+def _time(value):
+  ''' a UTC datetime from YYYY[MM[DD[HH[MM]]]] or an ISO 8601 date / time '''
+  try:
+    if value.isdigit() and len(value) in TIME_FORMATS:
+      moment = datetime.strptime(value, TIME_FORMATS[len(value)])
+    else:
+      moment = datetime.fromisoformat(value)
+  except ValueError:
+    raise argparse.ArgumentTypeError('not a time: %s' % value)
+  if moment.tzinfo is None:
+    moment = moment.replace(tzinfo=timezone.utc)
+  return moment
+
+
+def _box(value):
+  try:
+    edges = tuple(float(edge) for edge in value.split(','))
+  except ValueError:
+    edges = ()
+  if len(edges) != 4:
+    raise argparse.ArgumentTypeError('expected south,west,north,east, got %s' % value)
+  return edges
+
+
+def _names(values):
+  ''' comma separated and repeated options as one list, None if absent '''
+  if not values:
+    return None
+  return [name for value in values for name in value.split(',') if name]
+
+
+def _filter_options(args):
+  ''' the ish_parser filter keyword arguments given on the command line '''
+  options = {'report_types': _names(args.report_type), 'start': args.start, 'end': args.end,
+             'stations': _names(args.station), 'box': args.box}
+  return dict((key, value) for (key, value) in options.items() if value is not None)
+
+
+def _inputs(args):
+  ''' the input files, or [STDIN]. index sidecars found in directories
+  are left out '''
+  if args.paths == [STDIN]:
+    return [STDIN]
+  from .bulk import expand_paths
+  from .time_index import INDEX_SUFFIX
+  return [path for path in expand_paths(args.paths) if not path.endswith(INDEX_SUFFIX)]
+
+
+def _size(path):
+  try:
+    return os.path.getsize(path)
+  except (OSError, TypeError):
+    return 0
+
+
+class _progress(object):
+  ''' per file lines and a closing throughput line on stderr, when asked
+  for. failures are always reported, unless bulk.parse_file already
+  logged them '''
+
+  def __init__(self, enabled, total):
+    self.enabled = enabled
+    self.total = total
+    self.done = 0
+    self.failed = 0
+    self.items = 0
+    self.bytes = 0
+    self.start = time.perf_counter()
+
+  def file(self, path, count, seconds):
+    self.done += 1
+    self.items += count
+    self.bytes += _size(path)
+    if self.enabled:
+      sys.stderr.write('[%d/%d] %s  %d  %.2fs\n' % (self.done, self.total, path, count, seconds))
+
+  def fail(self, path, error, logged=False):
+    self.done += 1
+    self.failed += 1
+    if not logged:
+      sys.stderr.write('%s: %s\n' % (path, error))
+
+  def finish(self, what):
+    if self.enabled:
+      elapsed = max(time.perf_counter() - self.start, 1e-9)
+      sys.stderr.write('%d %s from %d files (%d failed) in %.1fs, %.1f MB/s, %.0f %s/s\n' % (
+        self.items, what, self.done, self.failed, elapsed, self.bytes / elapsed / 1024.0 / 1024.0,
+        self.items / elapsed, what))
+    return 1 if self.failed else 0
+
+
+def _results(paths, jobs, func, options):
+  ''' a bulk.ParseResult per path, standard input parsed here '''
+  from .bulk import parse_file, parse_many
+  if paths == [STDIN]:
+    result = parse_file(sys.stdin.buffer, func, **options)
+    result.path = STDIN
+    return [result]
+  return parse_many(paths, jobs, func, **options)
+
+
+def _write_reports(writer, errors, reports):
+  ''' write reports one by one, the ones that fail to decode go to errors
+  and the rest of the file carries on '''
+  count = 0
+  for report in reports:
+    try:
+      writer.write(report)
+    except Exception as exp:
+      errors.add_report(report, exp)
+      continue
+    count += 1
+  return count
+
+
+def convert(args):
+  paths = _inputs(args)
+  options = _filter_options(args)
+  progress = _progress(args.progress, len(paths))
+
+  if args.format == 'parquet':
+    if not args.output:
+      sys.stderr.write('parquet output needs -o DIRECTORY\n')
+      return 2
+    from .parquet import ish_parquet_writer
+    from .quarantine import quarantine
+    # one writer for the whole dataset, so files are parsed in this process
+    with ish_parquet_writer(args.output) as writer:
+      write = functools.partial(_write_reports, writer, quarantine())
+      for result in _results(paths, 1, write, options):
+        if result.ok:
+          progress.file(result.path, result.value, result.seconds)
+        else:
+          progress.fail(result.path, result.error, logged=True)
+    return progress.finish('reports')
+
+  if args.format == 'csv':
+    import csv
+    import io
+    from .csv_export import DEFAULT_COLUMNS, csv_columns, format_csv
+    columns = _names(args.columns) or list(DEFAULT_COLUMNS)
+    try:
+      compiled = csv_columns(columns)
+    except ValueError as exp:
+      sys.stderr.write('%s\n' % exp)
+      return 2
+    options['fields'] = compiled.fields
+    func = functools.partial(format_csv, columns)
+    heading = io.StringIO()
+    csv.writer(heading).writerow(compiled.headers)
+    heading = heading.getvalue()
+  else:
+    from .ndjson import format_ndjson
+    (func, heading) = (functools.partial(format_ndjson, None), None)
+
+  out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+  try:
+    if heading is not None:
+      out.write(heading.encode('utf-8'))
+    for result in _results(paths, args.jobs, func, options):
+      if result.ok:
+        (data, count) = result.value
+        out.write(data if isinstance(data, bytes) else data.encode('utf-8'))
+        progress.file(result.path, count, result.seconds)
+      else:
+        progress.fail(result.path, result.error, logged=True)
+  finally:
+    if out is not sys.stdout.buffer:
+      out.close()
+    else:
+      out.flush()
+  return progress.finish('reports')
+
+
+def filter_lines(args):
+  ''' copy the lines that pass the filters, undecoded. compressed input
+  comes out inflated '''
+  paths = _inputs(args)
+  options = _filter_options(args)
+  window = line_filter(**options) if options else None
+  progress = _progress(args.progress, len(paths))
+  out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+  try:
+    for path in paths:
+      start = time.perf_counter()
+      kept = 0
+      try:
+        with open_binary(sys.stdin.buffer if path == STDIN else path) as fp:
+          for line in fp:
+            if window is None or window.accepts(line):
+              out.write(line)
+              kept += 1
+      except BrokenPipeError:
+        raise
+      except (OSError, EOFError) as exp:
+        progress.fail(path, exp)
+        continue
+      progress.file(path, kept, time.perf_counter() - start)
+  finally:
+    if out is not sys.stdout.buffer:
+      out.close()
+    else:
+      out.flush()
+  return progress.finish('lines')
+
+
+def stats(args):
+  import json
+  from .catalog import summarize
+  from .timestamp import to_datetime
+  paths = _inputs(args)
+  progress = _progress(args.progress, len(paths))
+  for result in _results(paths, args.jobs, summarize,
+                         dict(_filter_options(args), lazy=True)):
+    summary = result.value
+    if not result.ok:
+      progress.fail(result.path, result.error, logged=True)
+      continue
+    if summary is None:
+      # nothing passed the filters
+      progress.file(result.path, 0, result.seconds)
+      continue
+    progress.file(result.path, summary['reports'], result.seconds)
+    if args.json:
+      print(json.dumps(dict(summary, path=result.path)))
+    else:
+      print('\t'.join((result.path, '%s-%s' % (summary['station'], summary['wban']),
+                       to_datetime(summary['first_time']).isoformat(),
+                       to_datetime(summary['last_time']).isoformat(), str(summary['reports']),
+                       ' '.join('%s:%d' % item for item in sorted(summary['report_types'].items())))))
+  return progress.finish('reports')
+
+
+def index(args):
+  from .time_index import build_index
+  paths = _inputs(args)
+  progress = _progress(args.progress, len(paths))
+  for path in paths:
+    start = time.perf_counter()
+    try:
+      index_path = build_index(path, args.every)
+    except (OSError, ValueError) as exp:
+      progress.fail(path, exp)
+      continue
+    progress.file(path, 1, time.perf_counter() - start)
+    print(index_path)
+  return progress.finish('indexes')
+
+
+def _parser():
+  inputs = argparse.ArgumentParser(add_help=False)
+  inputs.add_argument('paths', nargs='+', help='files, globs or directories, - for stdin')
+  inputs.add_argument('--progress', action='store_true', help='per file progress on stderr')
+  filters = argparse.ArgumentParser(add_help=False)
+  filters.add_argument('--start', type=_time,
+                       help='first time kept, YYYYMMDD[HH[MM]] or ISO 8601 (UTC)')
+  filters.add_argument('--end', type=_time, help='times from here on are dropped')
+  filters.add_argument('--report-type', action='append',
+                       help='report types to keep (FM-15,SAO..)')
+  filters.add_argument('--station', action='append',
+                       help='stations to keep, USAF or USAF-WBAN, comma separated')
+  filters.add_argument('--box', type=_box, help='only positions in south,west,north,east')
+  jobs = argparse.ArgumentParser(add_help=False)
+  jobs.add_argument('-j', '--jobs', type=int, default=1, help='parse on this many processes')
+
+  parser = argparse.ArgumentParser(prog='ish', description='work with NOAA ISH files')
+  commands = parser.add_subparsers(dest='command', metavar='command')
+  commands.required = True
+
+  command = commands.add_parser('convert', parents=[inputs, filters, jobs],
+                                help='write reports as csv, ndjson or parquet')
+  command.add_argument('-f', '--format', choices=FORMATS, default='csv')
+  command.add_argument('-o', '--output', help='output file (stdout) or parquet directory')
+  command.add_argument('--columns', action='append',
+                       help='csv columns, comma separated (see ish_parser.csv_export)')
+  command.set_defaults(run=convert)
+
+  command = commands.add_parser('filter', parents=[inputs, filters], help='copy the matching raw lines')
+  command.add_argument('-o', '--output', help='output file (stdout)')
+  command.set_defaults(run=filter_lines)
+
+  command = commands.add_parser('stats', parents=[inputs, filters, jobs], help='summarize each file')
+  command.add_argument('--json', action='store_true', help='a json object per file')
+  command.set_defaults(run=stats)
+
+  command = commands.add_parser('index', parents=[inputs], help='build time index sidecars')
+  command.add_argument('--every', type=int, default=1, help='index every Nth line')
+  command.set_defaults(run=index)
+  return parser
+
+
+def main(argv=None):
+  args = _parser().parse_args(argv)
+  try:
+    return args.run(args)
+  except BrokenPipeError:
+    # the reader went away (ish filter .. | head), not an error. stdout
+    # goes to devnull so flushing it on the way out doesn't fail again
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,180 @@
+''' batch decoding of the fixed width part of ish files into numpy arrays.
+
+the first 105 characters of every record (control and mandatory data
+sections) sit at the same offsets on every line, so instead of building
+an ish_report per line the whole file is read as bytes, the preamble of
+every record is gathered into one 2-D uint8 array and each field is
+decoded for all records at once. no ish_report objects are created.
+
+numeric fields keep the raw NOAA scaling and sentinels (tenths of a
+degree, 9999 for missing and so on) so nothing is lost, quality and flag
+fields are the ascii code of their character as uint8.
+'''
+from .ish_file import open_binary
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+PREAMBLE_LENGTH = 105
+NEWLINE = 10
+CARRIAGE_RETURN = 13
+ZERO = 48
+MINUS = 45
+
+# name: (start, stop, kind, dtype). kinds are 'int' (unsigned digits),
+# 'signed' (sign character followed by digits), 'str' (fixed width bytes)
+# and 'flag' (one character kept as its ascii code)
+FIELDS = {
+  'station': (4, 10, 'str', 'S6'),
+  'wban': (10, 15, 'str', 'S5'),
+  'source': (27, 28, 'flag', 'uint8'),
+  'latitude': (28, 34, 'signed', 'int32'),
+  'longitude': (34, 41, 'signed', 'int32'),
+  'report_type': (41, 46, 'str', 'S5'),
+  'elevation': (46, 51, 'signed', 'int16'),
+  'call_letters': (51, 56, 'str', 'S5'),
+  'quality_control': (56, 60, 'str', 'S4'),
+  'wind_direction': (60, 63, 'int', 'int16'),
+  'wind_direction_quality': (63, 64, 'flag', 'uint8'),
+  'wind_type': (64, 65, 'flag', 'uint8'),
+  'wind_speed': (65, 69, 'int', 'int16'),
+  'wind_speed_quality': (69, 70, 'flag', 'uint8'),
+  'sky_ceiling': (70, 75, 'int', 'int32'),
+  'sky_ceiling_quality': (75, 76, 'flag', 'uint8'),
+  'sky_ceiling_determination': (76, 77, 'flag', 'uint8'),
+  'cavok': (77, 78, 'flag', 'uint8'),
+  'visibility_distance': (78, 84, 'int', 'int32'),
+  'visibility_distance_quality': (84, 85, 'flag', 'uint8'),
+  'visibility_variability': (85, 86, 'flag', 'uint8'),
+  'visibility_variability_quality': (86, 87, 'flag', 'uint8'),
+  'air_temperature': (87, 92, 'signed', 'int16'),
+  'air_temperature_quality': (92, 93, 'flag', 'uint8'),
+  'dew_point': (93, 98, 'signed', 'int16'),
+  'dew_point_quality': (98, 99, 'flag', 'uint8'),
+  'sea_level_pressure': (99, 104, 'int', 'int32'),
+  'sea_level_pressure_quality': (104, 105, 'flag', 'uint8'),
+}
+
+# scale to turn the stored integers into the units ish_report uses
+SCALE = {'latitude': 1000.0, 'longitude': 1000.0, 'wind_speed': 10.0,
+         'air_temperature': 10.0, 'dew_point': 10.0, 'sea_level_pressure': 10.0}
+
+
+def _require_numpy():
+  if np is None:
+    raise ImportError('the columnar parser needs numpy, pip install numpy')
+
+
+def _line_bounds(buf):
+  ''' start and stop offsets of every line in the buffer, without the line
+  terminator '''
+  ends = np.flatnonzero(buf == NEWLINE)
+  if len(buf) and buf[-1] != NEWLINE:
+    ends = np.append(ends, len(buf))
+  starts = np.empty_like(ends)
+  starts[:1] = 0
+  starts[1:] = ends[:-1] + 1
+  stops = ends.copy()
+  crlf = (stops > starts) & (buf[np.maximum(stops - 1, 0)] == CARRIAGE_RETURN)
+  stops[crlf] -= 1
+  return starts, stops
+
+
+def _digits(block, start, stop):
+  ''' decode the ascii digits block[:, start:stop] into int64, along with a
+  mask of the rows where every character really was a digit '''
+  digits = block[:, start:stop].astype(np.int64) - ZERO
+  valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+  weights = 10 ** np.arange(stop - start - 1, -1, -1, dtype=np.int64)
+  return digits @ weights, valid
+
+
+def _decode_minutes(block):
+  ''' minutes since the epoch of the YYYYMMDDHHMM date at 15:27. worked out
+  arithmetically, so the 2400 hour NOAA sometimes uses simply rolls over
+  into the next day. the mask is False where the date doesn't exist '''
+  year, ok_year = _digits(block, 15, 19)
+  month, ok_month = _digits(block, 19, 21)
+  day, ok_day = _digits(block, 21, 23)
+  hour, ok_hour = _digits(block, 23, 25)
+  minute, ok_minute = _digits(block, 25, 27)
+  valid = ok_year & ok_month & ok_day & ok_hour & ok_minute
+  valid &= (month >= 1) & (month <= 12)
+
+  months = (year - 1970) * 12 + np.clip(month, 1, 12) - 1
+  days = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+  month_length = (months + 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) - days
+  # the same ranges as timestamp.epoch_seconds, 2400 is the only hour 24
+  valid &= (day >= 1) & (day <= month_length)
+  valid &= (minute <= 59) & ((hour < 24) | ((hour == 24) & (minute == 0)))
+  return (days + day - 1) * 1440 + hour * 60 + minute, valid
+
+
+def decode_block(block, offsets=None):
+  ''' decode an (n, 105) uint8 array of record preambles into a dict of
+  column arrays. rows with a non digit in a numeric field, or a date that
+  doesn't exist, are dropped '''
+  _require_numpy()
+  columns = {}
+  valid = np.ones(len(block), dtype=bool)
+  minutes, ok = _decode_minutes(block)
+  valid &= ok
+
+  for (name, (start, stop, kind, dtype)) in FIELDS.items():
+    if kind == 'str':
+      values = np.ascontiguousarray(block[:, start:stop]).view(dtype).ravel()
+      columns[name] = np.char.strip(values) if name == 'report_type' else values
+    elif kind == 'flag':
+      columns[name] = block[:, start].astype(dtype)
+    else:
+      first = start + 1 if kind == 'signed' else start
+      values, ok = _digits(block, first, stop)
+      if kind == 'signed':
+        ok &= (block[:, start] == MINUS) | (block[:, start] == ord('+'))
+        values = np.where(block[:, start] == MINUS, -values, values)
+      valid &= ok
+      columns[name] = values.astype(dtype)
+
+  columns['datetime'] = minutes.astype('datetime64[m]')
+  columns['timestamp'] = minutes * 60
+  if offsets is not None:
+    columns['offset'] = offsets
+
+  if not valid.all():
+    columns = dict((name, values[valid]) for (name, values) in columns.items())
+  return columns
+
+
+def loads_columns(data):
+  ''' decode the preambles of every record in a bytes-like object. lines
+  whose length does not match the length in their header are skipped,
+  the same as ish_report would reject them '''
+  _require_numpy()
+  buf = np.frombuffer(data, dtype=np.uint8)
+  starts, stops = _line_bounds(buf)
+  long_enough = (stops - starts) >= PREAMBLE_LENGTH
+  starts, stops = starts[long_enough], stops[long_enough]
+
+  block = buf[starts[:, None] + np.arange(PREAMBLE_LENGTH)]
+  declared, ok = _digits(block, 0, 4)
+  matching = ok & (declared + PREAMBLE_LENGTH == stops - starts)
+  return decode_block(block[matching], starts[matching])
+
+
+def read_columns(path_or_fileobj, cache=None):
+  ''' read an ish file (plain or compressed) and decode the fixed width
+  fields of every record into numpy arrays, see loads_columns. with a
+  cache.parse_cache, paths are looked up there first '''
+  if cache is not None and not hasattr(path_or_fileobj, 'read'):
+    return cache.read_columns(path_or_fileobj)
+  with open_binary(path_or_fileobj) as fp:
+    data = fp.read()
+  return loads_columns(data)
+
+
+def scaled(columns, name):
+  ''' a float32 copy of a numeric column in the units ish_report uses
+  (degrees, m/s, celsius, hectopascals) '''
+  return (columns[name] / SCALE.get(name, 1.0)).astype(np.float32)
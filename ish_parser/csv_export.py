@@ -0,0 +1,262 @@
+''' csv output straight from the parser stream.
+
+the columns are described up front, as a list of names (or (header,
+name) pairs to rename them):
+
+  weather_station, wban, latitude..   mandatory fields as they are
+  datetime, timestamp                 ISO 8601 UTC time, or epoch seconds
+  report_type                         the report type code (FM-15..)
+  air_temperature, wind_speed..       observation values, missing ones empty
+  air_temperature_quality..           the quality flag of an observation
+  air_temperature:fahrenheit..        an observation converted, see UNITS
+  humidity                            relative humidity
+  AA1, GA1..                          the text of an additional field
+  AA1.depth, KA1.temperature.value..  a value out of a component's toJson()
+
+the list is compiled once into a getter per column, rows are built a
+chunk of reports at a time, one column at a time, and handed to
+csv.writer as tuples. missing values are swapped for '' per column with
+a set lookup, not per report. when reading files only the fields the
+columns need are decoded (see ish_report.project), and with workers > 1
+files are parsed and formatted on a pool of processes.
+'''
+import csv
+import functools
+import io
+import itertools
+import math
+import os
+from operator import attrgetter
+
+from .bulk import expand_paths, parse_many
+from .Direction import Direction
+from .Distance import Distance
+from .ish_parser import ish_parser
+from .quarantine import quarantine
+from .ish_report import ish_report
+from .Pressure import Pressure
+from .Speed import Speed
+from .Temperature import Temperature
+from .timestamp import to_datetime
+
+CHUNK_SIZE = 4096
+MISSING = ''
+
+DEFAULT_COLUMNS = ('weather_station', 'wban', 'datetime', 'report_type', 'latitude',
+                   'longitude', 'elevation', 'air_temperature', 'dew_point',
+                   'wind_direction', 'wind_speed', 'sea_level_pressure', 'sky_ceiling',
+                   'visibility_distance')
+
+# the observation fields and their classes. the format fixes their units:
+# celsius, m/s, meters, hectopascals and degrees
+OBSERVATIONS = {'air_temperature': Temperature,
+                'dew_point': Temperature,
+                'wind_direction': Direction,
+                'wind_speed': Speed,
+                'sky_ceiling': Distance,
+                'visibility_distance': Distance,
+                'sea_level_pressure': Pressure}
+
+# conversions per class, rounded like get_fahrenheit, get_MilesPerHour..
+UNITS = {Temperature: {'fahrenheit': lambda value: round(1.8 * value + 32.0, 1)},
+         Speed: {'mph': lambda value: round(value * Speed.MPH_PER_MPS, 4)},
+         Distance: {'inches': lambda value: round(value * 100 * Distance.INCH_CONVERSION_FACTOR, 4),
+                    'miles': lambda value: round(value * 100 * Distance.INCH_CONVERSION_FACTOR /
+                                                 12 / 5280, 4)},
+         Pressure: {'inches': lambda value: round(value * 0.02953, 2)}}
+
+PLAIN = ('weather_station', 'wban', 'latitude', 'longitude', 'elevation',
+         'wind_observation_direction_type', 'sky_ceiling_determination',
+         'visibility_variability', 'visibility_variability_quality')
+
+
+def _observation(name, convert=None):
+  ''' values of an observation field, missing ones blank '''
+  cls = OBSERVATIONS[name]
+  missing = cls.MISSING if isinstance(cls.MISSING, list) else [cls.MISSING]
+  # wind direction is kept as text
+  missing = frozenset(missing) | frozenset(str(value) for value in missing)
+  number = int if cls is Direction else None
+  get = attrgetter(name + '._obs_value')
+
+  def values(reports):
+    raw = list(map(get, reports))
+    if number is not None:
+      raw = [value if value in missing else number(value) for value in raw]
+    if convert is None:
+      return [MISSING if value in missing else value for value in raw]
+    return [MISSING if value in missing else convert(value) for value in raw]
+  return values
+
+
+def _getter(get, missing=()):
+  missing = frozenset(missing)
+  if not missing:
+    return lambda reports: list(map(get, reports))
+  return lambda reports: [MISSING if value in missing else value for value in map(get, reports)]
+
+
+def _text(addl_code):
+  def values(reports):
+    return [report.get_additional_text(addl_code) or MISSING for report in reports]
+  return values
+
+
+def _component_value(addl_code, path):
+  ''' values found following path into the toJson() of a component '''
+  def value(report):
+    component = report.get_additional_field(addl_code)
+    if component is None:
+      return MISSING
+    value = component.toJson()
+    for key in path:
+      if not isinstance(value, dict) or key not in value:
+        return MISSING
+      value = value[key]
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+      return MISSING
+    return value
+  return lambda reports: list(map(value, reports))
+
+
+def _iso_time(report):
+  return to_datetime(report.timestamp).isoformat()
+
+
+def compile_column(name):
+  ''' (function from a list of reports to their values, the report fields
+  it needs) for one column name, see the module docstring. raises
+  ValueError for names it doesn't know '''
+  if name == 'datetime':
+    return (lambda reports: list(map(_iso_time, reports))), ('timestamp',)
+  if name == 'timestamp':
+    return _getter(attrgetter('timestamp')), ('timestamp',)
+  if name == 'report_type':
+    return _getter(attrgetter('report_type._obs_value')), ('report_type',)
+  if name == 'humidity':
+    return _getter(attrgetter('humidity.humidity'), ['MISSING']), ('humidity',)
+  if name in PLAIN:
+    return _getter(attrgetter(name)), (name,)
+  if name in OBSERVATIONS:
+    return _observation(name), (name,)
+  if name.endswith('_quality') and name[:-len('_quality')] in OBSERVATIONS:
+    field = name[:-len('_quality')]
+    return _getter(attrgetter(field + '._obs_quality')), (field,)
+  if ':' in name:
+    (field, unit) = name.split(':', 1)
+    conversions = UNITS.get(OBSERVATIONS.get(field), {})
+    if unit not in conversions:
+      raise ValueError('no unit %s for column %s' % (unit, field))
+    return _observation(field, conversions[unit]), (field,)
+
+  (addl_code, _, path) = name.partition('.')
+  if addl_code in ish_report.DECODERS:
+    if not path:
+      return _text(addl_code), (addl_code,)
+    return _component_value(addl_code, path.split('.')), (addl_code,)
+  raise ValueError('unknown column %s' % name)
+
+
+class csv_columns(object):
+  ''' a compiled column list, headers along with their getters and the
+  fields they need '''
+
+  def __init__(self, columns=DEFAULT_COLUMNS):
+    self.headers = []
+    self.getters = []
+    fields = set()
+    for column in columns:
+      (header, name) = (column, column) if isinstance(column, str) else column
+      (getter, needs) = compile_column(name)
+      self.headers.append(header)
+      self.getters.append(getter)
+      fields.update(needs)
+    self.fields = sorted(fields)
+
+  def rows(self, reports):
+    ''' the rows of a list of reports, as tuples '''
+    return zip(*[getter(reports) for getter in self.getters])
+
+  def write(self, writer, reports, chunk_size=CHUNK_SIZE, reject=None):
+    ''' write the rows of an iterable of reports a chunk at a time,
+    returns the number of rows. when a report in a chunk fails to decode
+    the chunk is done again report by report, and the ones that fail are
+    left out and handed to reject(report, exp) (see ish_parser.reject) '''
+    reports = iter(reports)
+    count = 0
+    while True:
+      chunk = list(itertools.islice(reports, chunk_size))
+      if not chunk:
+        return count
+      try:
+        rows = list(self.rows(chunk))
+      except Exception:
+        rows = self._rows_one_by_one(chunk, reject)
+      writer.writerows(rows)
+      count += len(rows)
+
+  def _rows_one_by_one(self, reports, reject):
+    rows = []
+    for report in reports:
+      try:
+        rows.extend(self.rows([report]))
+      except Exception as exp:
+        if reject is not None:
+          reject(report, exp)
+    return rows
+
+
+def format_csv(columns, reports):
+  ''' (the csv rows of a stream of reports as one string, how many) for
+  a list of column names. a module level function so parse_many can run
+  it in the workers '''
+  fh = io.StringIO()
+  count = csv_columns(columns).write(csv.writer(fh), reports)
+  return fh.getvalue(), count
+
+
+def _is_paths(source):
+  if isinstance(source, (str, os.PathLike)):
+    return True
+  return (isinstance(source, (list, tuple)) and len(source) > 0 and
+          isinstance(source[0], (str, os.PathLike)))
+
+
+def write_csv(source, fh, columns=DEFAULT_COLUMNS, header=True, workers=1, errors=None,
+              **options):
+  ''' write one csv row per report to fh, a text file opened with
+  newline=''. source is an iterable of reports, or a file, directory or
+  glob (or a list of them) whose files are parsed with the ish_parser
+  options given. columns is a list of column names or (header, name)
+  pairs, see the module docstring. unless options say otherwise only the
+  fields the columns need are decoded. a report with a field that fails
+  to decode is left out and goes to errors (a quarantine, see
+  ish_parser), as do the lines that fail to load. with workers > 1 files
+  are parsed on that many processes and written in order, and a file
+  that can't be read is logged and left out (see bulk.parse_file); the
+  quarantines of the workers are not sent back. returns the number of
+  rows written '''
+  compiled = csv_columns(columns)
+  writer = csv.writer(fh)
+  if header:
+    writer.writerow(compiled.headers)
+  if not _is_paths(source):
+    return compiled.write(writer, source,
+                          reject=(quarantine() if errors is None else errors).add_report)
+
+  if not any(key in options for key in ('lazy', 'compact', 'fields')):
+    options['fields'] = compiled.fields
+  paths = expand_paths([source] if isinstance(source, (str, os.PathLike)) else source)
+  count = 0
+  if workers <= 1:
+    for path in paths:
+      parser = ish_parser(errors=errors, **options)
+      count += compiled.write(writer, parser.iter_file(path), reject=parser.reject)
+    return count
+
+  for result in parse_many(paths, workers, functools.partial(format_csv, list(columns)),
+                           **options):
+    if result.ok:
+      fh.write(result.value[0])
+      count += result.value[1]
+  return count
@@ -0,0 +1,103 @@
+''' cheap tests against the fixed position bytes of a record, so lines
+nobody asked for are dropped before an ish_report is built.
+
+every check is a slice and a comparison on the undecoded line: the
+report type (41:46) and station (4:15) against sets, the YYYYMMDDHHMM
+date (15:27) against the bounds as strings, which sort the same way as
+the times they stand for (see _stamp for the 2400 hour), and the position (28:41) as integers in
+thousandths of a degree. the line can be str, or bytes / mmap with an
+offset, as iter_mapped hands them over.
+'''
+from datetime import datetime, timedelta, timezone
+
+from .ish_file import ENCODING
+
+GEO_SCALE = 1000
+
+
+def _both(values):
+  ''' a set of the str values along with their encoded bytes '''
+  values = frozenset(values)
+  return values | frozenset(value.encode(ENCODING) for value in values)
+
+
+def _stamp(value):
+  ''' YYYYMMDDHHMM of a datetime (naive ones are taken to be UTC) or a
+  string already in that form. midnight is written as hour 2400 of the
+  day before, so records that use that form compare equal to it '''
+  if not isinstance(value, str):
+    if value.tzinfo is not None:
+      value = value.astimezone(timezone.utc)
+    value = value.strftime('%Y%m%d%H%M')
+  if value[8:12] == '0000':
+    day_before = datetime.strptime(value[0:8], '%Y%m%d') - timedelta(days=1)
+    value = day_before.strftime('%Y%m%d') + '2400'
+  return value
+
+
+class line_filter(object):
+  ''' which records to keep. every argument is optional:
+
+  report_types: report type codes to keep (FM-15, SAO, ..)
+  start, end: keep start <= time < end, datetimes or YYYYMMDDHHMM strings
+  stations: USAF ids (725300) or USAF-WBAN pairs (725300-94846)
+  box: (south, west, north, east) in degrees, edges included. a box with
+       west > east crosses the antimeridian '''
+
+  def __init__(self, report_types=None, start=None, end=None, stations=None, box=None):
+    self.report_types = None if report_types is None else _both(report_types)
+
+    self.usaf = self.usaf_wban = None
+    if stations is not None:
+      stations = [station.replace('-', '') for station in stations]
+      self.usaf = _both(station for station in stations if len(station) == 6)
+      self.usaf_wban = _both(station for station in stations if len(station) != 6)
+
+    self.start = None if start is None else _stamp(start)
+    self.end = None if end is None else _stamp(end)
+    self.start_bytes = None if start is None else self.start.encode(ENCODING)
+    self.end_bytes = None if end is None else self.end.encode(ENCODING)
+
+    self.box = None
+    if box is not None:
+      self.box = tuple(int(round(edge * GEO_SCALE)) for edge in box)
+
+  def accepts(self, line, offset=0):
+    ''' whether the record starting at line[offset] passes every test '''
+    if self.report_types is not None:
+      if line[offset + 41:offset + 46].strip() not in self.report_types:
+        return False
+
+    if self.usaf is not None:
+      if (line[offset + 4:offset + 10] not in self.usaf and
+          line[offset + 4:offset + 15] not in self.usaf_wban):
+        return False
+
+    if self.start is not None or self.end is not None:
+      stamp = line[offset + 15:offset + 27]
+      if isinstance(stamp, str):
+        (start, end) = (self.start, self.end)
+      else:
+        (start, end) = (self.start_bytes, self.end_bytes)
+      if start is not None and stamp < start:
+        return False
+      if end is not None and stamp >= end:
+        return False
+
+    if self.box is not None:
+      (south, west, north, east) = self.box
+      try:
+        latitude = int(line[offset + 28:offset + 34])
+        longitude = int(line[offset + 34:offset + 41])
+      except ValueError:
+        return False
+      if not south <= latitude <= north:
+        return False
+      if west <= east:
+        if not west <= longitude <= east:
+          return False
+      elif east < longitude < west:
+        # crosses the antimeridian, everything outside east..west is in
+        return False
+
+    return True
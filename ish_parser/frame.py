@@ -0,0 +1,128 @@
+''' build pandas DataFrames from parsed reports.
+
+every column is gathered into a plain list first and converted in one go,
+so the MISSING sentinels of the observation classes become NaN with a
+single vectorised comparison per column rather than a get_numeric() call
+per value.
+'''
+from .Temperature import Temperature
+from .Speed import Speed
+from .Distance import Distance
+from .Direction import Direction
+from .Pressure import Pressure
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+try:
+  import pandas as pd
+except ImportError:
+  pd = None
+
+# observation columns: attribute on ish_report -> class holding MISSING.
+# each of these also gets a categorical <name>_quality column
+OBSERVATIONS = {'wind_direction': Direction,
+                'wind_speed': Speed,
+                'sky_ceiling': Distance,
+                'visibility_distance': Distance,
+                'air_temperature': Temperature,
+                'dew_point': Temperature,
+                'sea_level_pressure': Pressure}
+
+CATEGORICAL = ('weather_station', 'wban', 'report_type')
+NUMERIC = ('latitude', 'longitude', 'elevation', 'humidity')
+
+COLUMNS = (['datetime'] + list(CATEGORICAL) + list(NUMERIC) +
+           list(OBSERVATIONS.keys()))
+
+
+def _require_pandas():
+  if pd is None:
+    raise ImportError('to_dataframe needs pandas, pip install pandas')
+
+
+def missing_to_nan(values, missing):
+  ''' float array of values with every sentinel in missing set to NaN '''
+  if not isinstance(missing, list):
+    missing = [missing]
+  array = np.asarray(values, dtype=np.float64)
+  array[np.isin(array, np.asarray(missing, dtype=np.float64))] = np.nan
+  return array
+
+
+def _flatten(prefix, value, row, columns, length):
+  ''' spread a toJson() structure over <prefix>_<key> columns '''
+  if isinstance(value, dict):
+    for (key, item) in value.items():
+      _flatten('%s_%s' % (prefix, key), item, row, columns, length)
+    return
+  if prefix not in columns:
+    columns[prefix] = [None] * length
+  columns[prefix][row] = value
+
+
+def _additional_columns(reports, code):
+  ''' columns for one additional code. modelled components with a toJson
+  get one column per value, anything else is kept as its raw text. a
+  field that fails to decode is left missing, like an absent one '''
+  columns = {}
+  length = len(reports)
+  for (row, report) in enumerate(reports):
+    try:
+      component = report.get_additional_field(code)
+    except Exception:
+      continue
+    if component is None:
+      continue
+    try:
+      value = component.toJson()
+    except (AttributeError, NotImplementedError):
+      value = report.get_additional_text(code)
+    _flatten(code, value, row, columns, length)
+  if not columns:
+    columns[code] = [None] * length
+
+  for (name, values) in columns.items():
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (int, float)) for value in present):
+      columns[name] = np.asarray([np.nan if value is None else value for value in values],
+                                 dtype=np.float64)
+  return columns
+
+
+def reports_to_dataframe(reports, columns=None, include_additional=()):
+  ''' a DataFrame with one row per report. columns picks from COLUMNS
+  (all of them by default), include_additional adds the named additional
+  codes (AA1, GA1, ...) '''
+  _require_pandas()
+  reports = list(reports)
+  columns = COLUMNS if columns is None else columns
+  data = {}
+
+  for name in columns:
+    if name == 'datetime':
+      seconds = np.asarray([rpt.timestamp for rpt in reports], dtype=np.int64)
+      data[name] = pd.to_datetime(seconds, unit='s', utc=True)
+    elif name == 'report_type':
+      data[name] = pd.Categorical([rpt.report_type._obs_value for rpt in reports])
+    elif name in CATEGORICAL:
+      data[name] = pd.Categorical([getattr(rpt, name) for rpt in reports])
+    elif name == 'humidity':
+      values = [rpt.humidity.humidity for rpt in reports]
+      data[name] = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy()
+    elif name in NUMERIC:
+      data[name] = np.asarray([getattr(rpt, name) for rpt in reports], dtype=np.float64)
+    elif name in OBSERVATIONS:
+      observations = [getattr(rpt, name) for rpt in reports]
+      data[name] = missing_to_nan([obs._obs_value for obs in observations],
+                                  OBSERVATIONS[name].MISSING)
+      data[name + '_quality'] = pd.Categorical([obs._obs_quality for obs in observations])
+    else:
+      raise KeyError('unknown column %s, expected one of %s' % (name, ', '.join(COLUMNS)))
+
+  for code in include_additional:
+    data.update(_additional_columns(reports, code))
+
+  return pd.DataFrame(data)
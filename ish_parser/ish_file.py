@@ -0,0 +1,107 @@
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+
+# NOAA ships station-years as .gz, but people recompress archives all
+# sorts of ways. we sniff the first bytes rather than trusting the name
+MAGIC = ((b'\x1f\x8b', lambda fp: gzip.GzipFile(fileobj=fp, mode='rb')),
+         (b'BZh', lambda fp: bz2.BZ2File(fp, mode='rb')),
+         (b'\xfd7zXZ\x00', lambda fp: lzma.LZMAFile(fp, mode='rb')))
+MAGIC_LENGTH = max(len(magic) for (magic, _) in MAGIC)
+
+# ISH is plain ascii, but remarks occasionally carry stray high
+# bytes. latin-1 maps one byte to one char so the length check
+# against the record header still holds
+ENCODING = 'latin-1'
+BUFFER_SIZE = 64 * 1024
+
+
+def _peek(fp, length):
+  ''' look at the first bytes of a binary stream without consuming them '''
+  if hasattr(fp, 'peek'):
+    return fp.peek(length)[:length]
+  position = fp.tell()
+  head = fp.read(length)
+  fp.seek(position)
+  return head
+
+
+def decompressor(fp):
+  ''' wrap a binary stream in the matching decompressor, or return None
+  if it is not compressed. decompression is incremental, nothing is
+  inflated ahead of what the reader asks for '''
+  head = _peek(fp, MAGIC_LENGTH)
+  for (magic, handler) in MAGIC:
+    if head.startswith(magic):
+      return handler(fp)
+  return None
+
+
+@contextlib.contextmanager
+def open_binary(path_or_fileobj, buffer_size=BUFFER_SIZE):
+  ''' open an ish file as a binary stream, inflating gzip/bz2/xz input on
+  the way. accepts a path or a binary file object. only what was opened
+  here gets closed, file objects passed in are left open for the caller '''
+  owned = not hasattr(path_or_fileobj, 'read')
+  if owned:
+    raw = open(path_or_fileobj, 'rb', buffering=buffer_size)
+  else:
+    raw = path_or_fileobj
+
+  try:
+    inflated = decompressor(raw)
+    try:
+      yield inflated or raw
+    finally:
+      if inflated is not None:
+        inflated.close()
+  finally:
+    if owned:
+      raw.close()
+
+
+@contextlib.contextmanager
+def open_ish(path_or_fileobj, encoding=ENCODING, buffer_size=BUFFER_SIZE):
+  ''' open an ish file for line by line reading. accepts a path or a file
+  object, plain or gzip/bz2/xz compressed, and yields a text stream.
+  line endings are left as they are (\r\n stays \r\n), so with latin-1
+  the length of a line is its length in bytes '''
+  if isinstance(path_or_fileobj, io.TextIOBase):
+    yield path_or_fileobj
+    return
+
+  with open_binary(path_or_fileobj, buffer_size) as binary:
+    text = io.TextIOWrapper(binary, encoding=encoding, newline='')
+    try:
+      yield text
+    finally:
+      text.detach()
+
+
+def map_file(path):
+  ''' a read only memory map of a plain ish file, or None when the file is
+  compressed (there is nothing useful to map) or empty '''
+  with open(path, 'rb') as fp:
+    head = fp.read(MAGIC_LENGTH)
+    if not head or any(head.startswith(magic) for (magic, _) in MAGIC):
+      return None
+    return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def line_spans(buffer, position=0):
+  ''' (start, stop) of every line in a bytes-like buffer that has a find
+  method (bytes, mmap), without the line terminator. position is where
+  the first line starts '''
+  end = len(buffer)
+  while position < end:
+    newline = buffer.find(b'\n', position)
+    if newline < 0:
+      newline = end
+    stop = newline
+    if stop > position and buffer[stop - 1:stop] == b'\r':
+      stop -= 1
+    yield (position, stop)
+    position = newline + 1
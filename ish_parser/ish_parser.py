@@ -1,5 +1,10 @@
-import logging
+import io
 from .ish_report import ish_report
+from . import ish_file
+from .ish_file import open_ish, map_file, line_spans
+from .filters import line_filter
+from . import time_index
+from .quarantine import quarantine, reason_of
 
 class ish_parser(object):
   ''' primary object for parsing ish files, this class is
@@ -8,28 +13,188 @@ class ish_parser(object):
   the specific ish report '''
 
   OBS_TYPES = ['FM-12', 'FM-15', 'SAO']
+  MIN_LINE_LENGTH = 10
 
-  def __init__(self):
+  # read buffer used when streaming from a file, the line parser
+  # never holds more than this (plus the current line) in memory
+  BUFFER_SIZE = ish_file.BUFFER_SIZE
+
+  ENCODING = ish_file.ENCODING
+
+  def __init__(self, lazy=False, compact=False, fields=None, report_types=None,
+               start=None, end=None, stations=None, box=None, stats=None, errors=None):
+    ''' lazy is handed to every ish_report, see there. compact reports
+    are fully decoded and drop their line, for keeping a lot of them
+    around, see ish_report.loads. fields lists the only fields decoded
+    when a report is loaded, see ish_report.project. the remaining
+    arguments only keep some of the records and are checked before a
+    report is built, see filters.line_filter. stats (a stats.parse_stats)
+    collects counts and stage timings of everything parsed. lines that
+    fail to load go to errors, a quarantine.quarantine (a default one
+    keeping the first lines in memory if None), see get_errors '''
+    if sum((lazy, compact, fields is not None)) > 1:
+      raise ValueError('reports can be lazy, compact or limited to fields, only one of them')
+    self._lazy = lazy
+    self._compact = compact
+    self._fields = None if fields is None else ish_report.project(fields)
+    self._filter = None
+    if any(value is not None for value in (report_types, start, end, stations, box)):
+      self._filter = line_filter(report_types, start, end, stations, box)
+    self._stats = stats
+    self._errors = quarantine() if errors is None else errors
+    # (report, source, offset) of the report streamed last, see reject
+    self._last = None
     self._reports = []
 
   def loads(self, string):
     ''' load from a string '''
-    for line in string.split("\n"):
-      if len(line) < 10:
+    self._reports.extend(self.iter_reports(io.StringIO(string)))
+
+  def load(self, path_or_fileobj):
+    ''' load from a path or an open file object, keeping every report '''
+    self._reports.extend(self.iter_file(path_or_fileobj))
+
+  def iter_reports(self, lines, source=None):
+    ''' parse an iterable of lines, yielding each ish_report as soon as
+    it is parsed. nothing is kept on the parser, so memory use does
+    not grow with the number of reports. source names where the lines
+    come from for the lines that go to quarantine. their offsets count
+    the characters of the lines given, terminators included, which is
+    the byte offset for lines read by iter_file (see ish_file.open_ish)
+    but not for text that went through newline translation '''
+    return self._iter_lines(lines, source)
+
+  def _iter_lines(self, lines, source, window=None):
+    stats = self._stats
+    offset = 0
+    for line in lines:
+      start = offset
+      offset += len(line)
+      if stats is not None:
+        stats.line(len(line))
+      line = line.rstrip('\r\n')
+      if len(line) < self.MIN_LINE_LENGTH:
+        if stats is not None:
+          stats.reject('short')
+        continue
+      if ((window is not None and not window.accepts(line)) or
+          (self._filter is not None and not self._filter.accepts(line))):
+        if stats is not None:
+          stats.reject('filtered')
+        continue
+
+      try:
+        report = ish_report(self._lazy)
+        report.loads(line, self._compact, self._fields, stats)
+      except Exception as exp:
+        self._reject(source, start, exp, line)
+        continue
+      if stats is not None:
+        stats.reports += 1
+      self._last = (report, source, start)
+      yield report
+
+  def _reject(self, source, offset, exp, line):
+    reason = reason_of(exp)
+    if self._stats is not None:
+      self._stats.reject(reason)
+    self._errors.add(source, offset, reason, str(exp), line)
+
+  def reject(self, report, exp):
+    ''' send a report that loaded but failed later, when a field was
+    decoded on demand (an additional field, or anything of a lazy report),
+    to the quarantine. where it came from is known while it is the report
+    streamed last, which is the case when it is handled as it comes '''
+    (source, offset) = (None, None)
+    if self._last is not None and self._last[0] is report:
+      (source, offset) = self._last[1:]
+    if self._stats is not None:
+      self._stats.reject(reason_of(exp))
+    self._errors.add_report(report, exp, source, offset)
+
+  def iter_file(self, path_or_fileobj):
+    ''' stream reports from a path or a file object, reading line by line
+    through a bounded buffer. gzip, bz2 and xz input is recognised by its
+    magic bytes and inflated as it is read. file objects are not closed '''
+    source = getattr(path_or_fileobj, 'name', path_or_fileobj)
+    with open_ish(path_or_fileobj, self.ENCODING, self.BUFFER_SIZE) as fp:
+      for report in self.iter_reports(fp, source):
+        yield report
+
+  def iter_mapped(self, path):
+    ''' stream reports from a plain file through a read only memory map.
+    each report keeps the map and its offset in it rather than a copy of
+    the line, so the page cache holds the data and huge files cost
+    little memory. compressed files can't be mapped and go through
+    iter_file instead '''
+    mapping = map_file(path)
+    if mapping is None:
+      for report in self.iter_file(path):
+        yield report
+      return
+
+    for report in self._iter_spans(mapping, line_spans(mapping), path):
+      yield report
+
+  def read_range(self, path, start=None, end=None, index_path=None):
+    ''' the reports of a time ordered file with start <= time < end
+    (datetimes or YYYYMMDDHHMM strings, None for an open end). the first
+    record is found through the sidecar index when there is an up to date
+    one (see time_index.build_index), by bisecting the file otherwise,
+    and only the records in range are parsed. compressed files can't be
+    searched and are filtered line by line instead '''
+    window = line_filter(start=start, end=end)
+    mapping = map_file(path)
+    if mapping is None:
+      with open_ish(path, self.ENCODING, self.BUFFER_SIZE) as fp:
+        for report in self._iter_lines(fp, path, window):
+          yield report
+      return
+
+    index = time_index.read_index(path, index_path)
+    spans = time_index.range_spans(mapping, window.start_bytes, window.end_bytes, index)
+    for report in self._iter_spans(mapping, spans, path):
+      yield report
+
+  def _iter_spans(self, mapping, spans, source=None):
+    stats = self._stats
+    for (start, stop) in spans:
+      if stats is not None:
+        stats.line(stop - start)
+      if stop - start < self.MIN_LINE_LENGTH:
+        if stats is not None:
+          stats.reject('short')
+        continue
+      if self._filter is not None and not self._filter.accepts(mapping, start):
+        if stats is not None:
+          stats.reject('filtered')
         continue
 
       try:
-        report = ish_report()
-        report.loads(line)
-        self._reports.append(report)
-      except BaseException as exp:
-        ''' don't complain TOO much '''
-        logging.warning('unable to load report, error: %s' % exp)
+        report = ish_report(self._lazy)
+        report.load_buffer(mapping, start, stop - start, self._compact, self._fields, stats)
+      except Exception as exp:
+        self._reject(source, start, exp, str(mapping[start:stop], self.ENCODING))
+        continue
+      if stats is not None:
+        stats.reports += 1
+      self._last = (report, source, start)
+      yield report
 
   def get_reports(self):
     ''' return a list of all the reports '''
     return self._reports
 
+  def get_errors(self):
+    ''' the quarantine holding the lines that failed to load '''
+    return self._errors
+
+  def to_dataframe(self, columns=None, include_additional=()):
+    ''' the loaded reports as a pandas DataFrame, one row per report. see
+    frame.reports_to_dataframe for the columns '''
+    from .frame import reports_to_dataframe
+    return reports_to_dataframe(self._reports, columns, include_additional)
+
   def get_observations(self):
     ''' return only specific weather observations (FM types) and
     ignore the summary of day reports '''
@@ -1,7 +1,6 @@
-from datetime import datetime, timedelta
-import logging
-import pytz
 import json
+import sys
+from collections.abc import Mapping
 
 from .Temperature import Temperature
 from .Speed import Speed
@@ -11,11 +10,119 @@ from .Humidity import Humidity
 from .ReportType import ReportType
 from .Pressure import Pressure
 from .Direction import Direction
+from .timestamp import epoch_seconds, to_datetime
+from .ish_file import ENCODING
 from .Components import *
 
 
-class ish_reportException(BaseException):
-    ''' handler class for exceptions '''
+class ish_reportException(Exception):
+    ''' handler class for exceptions. reason is a short code for what
+  went wrong, see quarantine '''
+
+    def __init__(self, message='', reason='error'):
+        super(ish_reportException, self).__init__(message)
+        self.reason = reason
+
+
+class _mandatory_field(object):
+    ''' a mandatory data element of a report. the decoder runs against the
+  stored line the first time the field is read, and the value is then
+  kept in a slot named after the field with a leading underscore '''
+
+    def __init__(self, decode):
+        self.decode = decode
+        self.__doc__ = decode.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = owner.__dict__['_' + name]
+
+    def __get__(self, report, owner=None):
+        if report is None:
+            return self
+        try:
+            return self.slot.__get__(report, owner)
+        except AttributeError:
+            return self.load(report)
+
+    def __set__(self, report, value):
+        self.slot.__set__(report, value)
+
+    def load(self, report):
+        value = self.decode(report)
+        self.slot.__set__(report, value)
+        return value
+
+
+def _component_decoder(component):
+    ''' decoder building a Component object from the text of a field '''
+    def decode(text):
+        value = component()
+        value.loads(text)
+        return value
+    return decode
+
+
+def _raw_decoder(text):
+    ''' decoder for codes without a Component class, the text is kept '''
+    return text
+
+
+def _compile_decoders(field_map):
+    ''' turn MAP into code -> (length, decode). length is None for the
+  variable length codes, which carry their length in the record '''
+    decoders = {}
+    for (code, spec) in field_map.items():
+        length = None if spec[1] is False else spec[1]
+        decode = _component_decoder(spec[2]) if len(spec) > 2 else _raw_decoder
+        decoders[code] = (length, decode)
+    return decoders
+
+
+class _packed_fields(Mapping):
+    ''' read only mapping over a tuple of keys and a tuple of values, which
+  is how compact reports keep their additional fields and remarks. there
+  are only a handful per report, so scanning the keys is as quick as
+  hashing and a lot smaller than a dict '''
+    __slots__ = ('_keys', '_values')
+
+    def __init__(self, keys=(), values=()):
+        self._keys = keys
+        self._values = values
+
+    @classmethod
+    def pack(cls, mapping):
+        if not mapping:
+            return EMPTY_FIELDS
+        return cls(tuple(sys.intern(key) for key in mapping), tuple(mapping.values()))
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+EMPTY_FIELDS = _packed_fields()
+
+
+class _projection(object):
+    ''' the fields a job asked for, see ish_report.project '''
+    __slots__ = ('mandatory', 'codes', 'remarks')
+
+    def __init__(self, mandatory, codes, remarks):
+        self.mandatory = mandatory
+        self.codes = codes
+        self.remarks = remarks
 
 
 class ish_report(object):
@@ -278,14 +385,77 @@ class ish_report(object):
            'WD1': ['WATER-SURFACE-ICE', 20],
            'WG1': ['WATER_SURFACE-ICE-HISTORICAL', 11],
            'WJ1': ['WATER-LEVEL-OBSERVATION', 19]}
-
-    def __init__(self):
-        self._additional = {}
-        self._remarks = {}
+    DECODERS = _compile_decoders(MAP)
+    # codes that end the additional section
+    END_CODES = ('REM', 'EQD')
+
+    __slots__ = ('_raw', '_buffer', '_offset', '_lazy', '_additional', '_additional_offsets',
+                 '_additional_resume', '_remarks',
+                 '_weather_station', '_wban', '_timestamp', '_datetime', '_report_type',
+                 '_latitude', '_longitude', '_elevation', '_wind_direction',
+                 '_wind_observation_direction_type', '_wind_speed', '_sky_ceiling',
+                 '_sky_ceiling_determination', '_visibility_distance',
+                 '_visibility_variability', '_visibility_variability_quality',
+                 '_air_temperature', '_dew_point', '_humidity', '_sea_level_pressure')
+
+    def __init__(self, lazy=False):
+        ''' with lazy set, loads only checks the record length. mandatory
+      fields are decoded when they are first read and the additional
+      section is walked on the first additional lookup, so problems with
+      those surface there instead of in loads '''
+        self._lazy = lazy
+        self._raw = None
+        self._buffer = None
+        self._additional = None
+        self._additional_offsets = None
+        self._additional_resume = None
+        self._remarks = None
+
+    def __getstate__(self):
+        ''' reports loaded from a buffer are pickled with their line text,
+      the buffer itself (usually a memory map) is left behind '''
+        state = dict((name, getattr(self, name)) for name in self.__slots__
+                     if hasattr(self, name))
+        if self._buffer is not None:
+            state.update(_raw=self.raw, _buffer=None)
+            del state['_offset']
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            setattr(self, name, value)
+
+    @property
+    def raw(self):
+        ''' the text of the report line. reports loaded with load_buffer
+      only keep their offset, and decode the line from the buffer each
+      time it is asked for '''
+        if self._raw is None and self._buffer is not None:
+            header = str(self._buffer[self._offset:self._offset + 4], ENCODING)
+            end = self._offset + int(header) + self.PREAMBLE_LENGTH
+            return str(self._buffer[self._offset:end], ENCODING)
+        return self._raw
+
+    @raw.setter
+    def raw(self, noaa_string):
+        self._raw = noaa_string
 
     def __getattr__(self, attribute_name):
+        if attribute_name.startswith('_'):
+            ''' private and magic names are never additional fields, and
+          looking them up here recurses while unpickling '''
+            raise AttributeError(attribute_name)
+
+        try:
+            additional = self.additional()
+        except Exception:
+            ''' not loaded yet, or the additional section doesn't decode.
+          either way there is no such attribute, so getattr with a default
+          and hasattr behave '''
+            raise AttributeError(attribute_name)
+
         values_to_return = []
-        for (addl_code, addl) in self._additional.items():
+        for (addl_code, addl) in additional.items():
             try:
                 addl_value = getattr(addl, attribute_name)
                 values_to_return.append(addl_value)
@@ -371,87 +541,286 @@ Solar Irradiance: %s
 
         return json.dumps(dic_repport)
 
-    def loads(self, noaa_string):
-        ''' load in a report (or set) from a string '''
+    @_mandatory_field
+    def weather_station(self):
+        return sys.intern(self.raw[4:10])
+
+    @_mandatory_field
+    def wban(self):
+        return sys.intern(self.raw[10:15])
+
+    @_mandatory_field
+    def timestamp(self):
+        ''' observation time as seconds since the epoch, UTC '''
+        return epoch_seconds(self.raw[15:27])
+
+    @_mandatory_field
+    def datetime(self):
+        return to_datetime(self.timestamp)
+
+    @_mandatory_field
+    def report_type(self):
+        return ReportType.intern(self.raw[41:46].strip())
+
+    @_mandatory_field
+    def latitude(self):
+        return float(self.raw[28:34]) / self.GEO_SCALE
+
+    @_mandatory_field
+    def longitude(self):
+        return float(self.raw[34:41]) / self.GEO_SCALE
+
+    @_mandatory_field
+    def elevation(self):
+        return int(self.raw[46:51])
+
+    @_mandatory_field
+    def wind_direction(self):
+        return Direction.intern(self.raw[60:63], Direction.RADIANS, self.raw[63:64])
+
+    @_mandatory_field
+    def wind_observation_direction_type(self):
+        return self.raw[64:64]
+
+    @_mandatory_field
+    def wind_speed(self):
+        return Speed(int(self.raw[65:69]) / float(self.SPEED_SCALE),
+                     Speed.METERSPERSECOND,
+                     self.raw[69:70])
+
+    @_mandatory_field
+    def sky_ceiling(self):
+        return Distance(int(self.raw[70:75]), Distance.METERS, self.raw[75:76])
+
+    @_mandatory_field
+    def sky_ceiling_determination(self):
+        return self.raw[76:77]
+
+    @_mandatory_field
+    def visibility_distance(self):
+        return Distance(int(self.raw[78:84]), Distance.METERS, self.raw[84:85])
+
+    @_mandatory_field
+    def visibility_variability(self):
+        return self.raw[85:86]
+
+    @_mandatory_field
+    def visibility_variability_quality(self):
+        return self.raw[86:87]
+
+    @_mandatory_field
+    def air_temperature(self):
+        return Temperature(int(self.raw[87:92]) / self.TEMPERATURE_SCALE,
+                           Units.CELSIUS,
+                           self.raw[92:93])
+
+    @_mandatory_field
+    def dew_point(self):
+        return Temperature(int(self.raw[93:98]) / self.TEMPERATURE_SCALE,
+                           Units.CELSIUS,
+                           self.raw[98:99])
+
+    @_mandatory_field
+    def humidity(self):
+        return Humidity(str(self.air_temperature), str(self.dew_point))
+
+    @_mandatory_field
+    def sea_level_pressure(self):
+        return Pressure(int(self.raw[99:104]) / self.PRESSURE_SCALE,
+                        Pressure.HECTOPASCALS,
+                        self.raw[104:104])
+
+    # datetime is left out, it is built from timestamp when it is read
+    MANDATORY_FIELDS = (weather_station, wban, timestamp, report_type, latitude,
+                        longitude, elevation, wind_direction,
+                        wind_observation_direction_type, wind_speed, sky_ceiling,
+                        sky_ceiling_determination, visibility_distance,
+                        visibility_variability, visibility_variability_quality,
+                        air_temperature, dew_point, humidity, sea_level_pressure)
+
+    @classmethod
+    def project(cls, fields):
+        ''' compile a list of wanted fields, mandatory field names
+      (air_temperature, datetime..), additional codes (AA1, GA1..) and
+      remarks, for loads. raises ValueError for anything else '''
+        by_name = dict((field.name, field) for field in cls.MANDATORY_FIELDS)
+        by_name['datetime'] = cls.datetime
+        mandatory = []
+        codes = set()
+        for name in fields:
+            if name in by_name:
+                mandatory.append(by_name[name])
+            elif name in cls.DECODERS:
+                codes.add(name)
+            elif name != 'remarks':
+                raise ValueError('unknown field %s' % name)
+        return _projection(tuple(mandatory), frozenset(codes), 'remarks' in fields)
+
+    def loads(self, noaa_string, compact=False, fields=None, stats=None):
+        ''' load in a report (or set) from a string. with compact set the
+      whole report is decoded straight away and the line is dropped, see
+      _compact. fields (a list, or what project returns) limits what
+      is decoded here to those fields, the rest is decoded on demand.
+      stats (a stats.parse_stats) gets the time spent in each stage '''
         self.raw = noaa_string
-        self.weather_station = noaa_string[4:10]
-        self.wban = noaa_string[10:15]
-        expected_length = int(noaa_string[0:4]) + self.PREAMBLE_LENGTH
-        actual_length = len(noaa_string)
+        self._check_length(noaa_string[0:4], len(noaa_string))
+        if compact:
+            self._compact(stats)
+        elif not self._lazy:
+            self._decode(fields, stats)
+        return self
+
+    def load_buffer(self, buffer, offset, length, compact=False, fields=None, stats=None):
+        ''' load the report at buffer[offset:offset + length] of a bytes,
+      mmap or memoryview buffer. the report keeps a reference to the
+      buffer and the offset instead of a copy of the line '''
+        self._check_length(str(buffer[offset:offset + 4], ENCODING), length)
+        self._buffer = buffer
+        self._offset = offset
+        if compact:
+            self._compact(stats)
+        elif not self._lazy:
+            # decode from one copy of the line rather than one per field
+            self._raw = self.raw
+            self._decode(fields, stats)
+            self._raw = None
+        return self
+
+    def _check_length(self, header, actual_length):
+        expected_length = int(header) + self.PREAMBLE_LENGTH
         if actual_length != expected_length:
             msg = "Non matching lengths. Expected %d, got %d" % (expected_length,
                                                                  actual_length)
-            raise ish_reportException(msg)
-
-        try:
-            self.datetime = datetime.strptime(noaa_string[15:27], '%Y%m%d%H%M')
-        except ValueError:
-            ''' some cases, we get 2400 hours, which is really the next day, so 
-      this is a workaround for those cases '''
-            time = noaa_string[15:27]
-            time = time.replace("2400", "2300")
-            self.datetime = datetime.strptime(time, '%Y%m%d%H%M')
-            self.datetime += timedelta(hours=1)
-
-        self.datetime = self.datetime.replace(tzinfo=pytz.UTC)
-
-        self.report_type = ReportType(noaa_string[41:46].strip())
-
-        self.latitude = float(noaa_string[28:34]) / self.GEO_SCALE
-        self.longitude = float(noaa_string[34:41]) / self.GEO_SCALE
-        self.elevation = int(noaa_string[46:51])
-
-        ''' other mandatory fields '''
-        self.wind_direction = Direction(noaa_string[60:63],
-                                        Direction.RADIANS,
-                                        noaa_string[63:64])
-        self.wind_observation_direction_type = noaa_string[64:64]
-        self.wind_speed = Speed(int(noaa_string[65:69]) / float(self.SPEED_SCALE),
-                                Speed.METERSPERSECOND,
-                                noaa_string[69:70])
-        self.sky_ceiling = Distance(int(noaa_string[70:75]),
-                                    Distance.METERS,
-                                    noaa_string[75:76])
-        self.sky_ceiling_determination = noaa_string[76:77]
-        self.visibility_distance = Distance(int(noaa_string[78:84]),
-                                            Distance.METERS,
-                                            noaa_string[84:85])
-        self.visibility_variability = noaa_string[85:86]
-        self.visibility_variability_quality = noaa_string[86:87]
-
-        self.air_temperature = Temperature(int(noaa_string[87:92]) / self.TEMPERATURE_SCALE,
-                                           Units.CELSIUS,
-                                           noaa_string[92:93])
-        self.dew_point = Temperature(int(noaa_string[93:98]) / self.TEMPERATURE_SCALE,
-                                     Units.CELSIUS,
-                                     noaa_string[98:99])
-
-        self.humidity = Humidity(str(self.air_temperature), str(self.dew_point))
-        self.sea_level_pressure = Pressure(int(noaa_string[99:104]) / self.PRESSURE_SCALE,
-                                           Pressure.HECTOPASCALS,
-                                           noaa_string[104:104])
-
-        ''' handle the additional fields '''
-        additional = noaa_string[105:108]
-        if additional == 'ADD':
+            raise ish_reportException(msg, 'length')
+
+    def _decode(self, fields=None, stats=None):
+        if stats is not None:
+            self._decode_timed(fields, stats, stats.decode_all)
+            return
+        if fields is None:
+            for field in self.MANDATORY_FIELDS:
+                field.load(self)
+            self._scan_additional()
+            return
+
+        if not isinstance(fields, _projection):
+            fields = self.project(fields)
+        for field in fields.mandatory:
+            field.load(self)
+        if fields.codes:
+            self._scan_additional(fields.codes)
+        if fields.remarks:
+            self.remarks()
+
+    def _decode_timed(self, fields, stats, everything):
+        ''' _decode, adding the time of each stage to stats. with everything
+      set the components and remarks are decoded (and timed) as well '''
+        if fields is None:
+            (mandatory, codes, remarks) = (self.MANDATORY_FIELDS, None, everything)
+        else:
+            if not isinstance(fields, _projection):
+                fields = self.project(fields)
+            (mandatory, codes, remarks) = (fields.mandatory, fields.codes,
+                                           fields.remarks or everything)
+        clock = stats.clock
+        timestamp = ish_report.timestamp
+
+        start = clock()
+        if timestamp in mandatory:
+            timestamp.load(self)
+        decoded = clock()
+        for field in mandatory:
+            if field is not timestamp:
+                field.load(self)
+        stats.add_time('timestamp', decoded - start)
+        start = clock()
+        stats.add_time('mandatory', start - decoded)
+
+        if fields is None or codes:
+            self._scan_additional(codes)
+            stats.add_time('additional', clock() - start)
+            stats.add_codes(self._additional_offsets.keys())
+        if everything and self._additional_offsets:
+            for addl_code in list(self._additional_offsets):
+                start = clock()
+                self.get_additional_field(addl_code)
+                stats.add_code_time(addl_code, clock() - start)
+        if remarks:
+            start = clock()
+            self.remarks()
+            stats.add_time('remarks', clock() - start)
+
+    def _compact(self, stats=None):
+        ''' decode everything, then let go of the line (or buffer) and keep
+      the additional fields and remarks packed into tuples. raw is None
+      afterwards, and get_additional_text only has the fields that are
+      kept as text anyway '''
+        self._raw = self.raw
+        if stats is None:
+            self._decode()
+        else:
+            self._decode_timed(None, stats, True)
+        self._additional = self._additional_offsets = _packed_fields.pack(self.additional())
+        self._remarks = _packed_fields.pack(self.remarks())
+        self._raw = None
+        self._buffer = None
+
+    def _scan_additional(self, wanted=None):
+        ''' handle the additional fields. only their positions are recorded
+      here, the components are built the first time somebody asks. with
+      wanted (a set of codes) the walk stops once all of those are found,
+      and a later lookup of anything else carries on from there '''
+        if self._additional_offsets is not None and self._additional_resume is None:
+            # already walked to the end
+            return self._additional_offsets
+        raw = self.raw
+        if self._additional_offsets is None:
+            offsets = self._additional_offsets = {}
+            if raw[105:108] != 'ADD':
+                return offsets
             position = 108
-            while position < expected_length:
-                try:
-                    (position, (addl_code, addl_string)) = self._get_component(noaa_string,
-                                                                               position)
-                    self._additional[addl_code] = addl_string
-                except ish_reportException as err:
-                    ''' this catches when we move to remarks section '''
-                    break
-
-        ''' handle the remarks section if it exists '''
-        try:
-            position = noaa_string.index('REM', 108)
-            self._get_remarks_component(noaa_string, position)
-        except (ish_reportException, ValueError) as err:
-            ''' this catches when we move to EQD section '''
+        else:
+            offsets = self._additional_offsets
+            position = self._additional_resume
+        self._additional_resume = None
+        remaining = len(wanted) if wanted is not None else -1
 
-        return self
+        decoders = self.DECODERS
+        expected_length = len(raw)
+        while position < expected_length:
+            if remaining == 0:
+                self._additional_resume = position
+                break
+            addl_code = raw[position:position + self.ADDR_CODE_LENGTH]
+            if addl_code in self.END_CODES:
+                break
+            decoder = decoders.get(addl_code)
+            if decoder is None:
+                # left to resume at the bad code, so asking again raises
+                # again instead of handing back the fields before it
+                self._additional_resume = position
+                raise ish_reportException("Cannot find code %s in string %s (%d)." % (addl_code, raw, position),
+                                          'unknown_code')
+
+            position += self.ADDR_CODE_LENGTH
+            chars_to_read = decoder[0]
+            # no defined length, the next three chars after the code give it
+            if chars_to_read is None:
+                chars_to_read = int(raw[position + self.ADDR_CODE_LENGTH:position + \
+                                                                      (self.ADDR_CODE_LENGTH * 2)])
+                position += (self.ADDR_CODE_LENGTH * 2)
+            offsets[addl_code] = (position, position + chars_to_read)
+            position += chars_to_read
+            if remaining > 0 and addl_code in wanted:
+                remaining -= 1
+        return offsets
+
+    def _additional_span(self, addl_code):
+        ''' where an additional field is, walking as far as needed '''
+        if self._additional_offsets is None or (self._additional_resume is not None and
+                                                addl_code not in self._additional_offsets):
+            self._scan_additional()
+        return self._additional_offsets.get(addl_code)
 
     def _get_remarks_component(self, string, initial_pos):
         ''' Parse the remarks into the _remarks dict '''
@@ -473,51 +842,58 @@ Solar Irradiance: %s
             self._remarks[key] = string_value
             position += chars_to_read
 
-    def _get_component(self, string, initial_pos):
-        ''' given a string and a position, return both an updated position and
-    either a Component Object or a String back to the caller '''
-        add_code = string[initial_pos:initial_pos + self.ADDR_CODE_LENGTH]
-
-        if add_code == 'REM':
-            raise ish_reportException("This is a remarks record")
-        if add_code == 'EQD':
-            raise ish_reportException("This is EQD record")
-
-        initial_pos += self.ADDR_CODE_LENGTH
-        try:
-            useable_map = self.MAP[add_code]
-        except:
-            raise BaseException("Cannot find code %s in string %s (%d)." % (add_code, string, initial_pos))
-
-        # if there is no defined length, then read next three chars to get it
-        # this only applies to REM types, which have 3 chars for the type, then variable
-        if useable_map[1] is False:
-            chars_to_read = string[initial_pos + self.ADDR_CODE_LENGTH:initial_pos + \
-                                                                       (self.ADDR_CODE_LENGTH * 2)]
-            chars_to_read = int(chars_to_read)
-            initial_pos += (self.ADDR_CODE_LENGTH * 2)
-        else:
-            chars_to_read = useable_map[1]
-
-        new_position = initial_pos + chars_to_read
-        string_value = string[initial_pos:new_position]
-
-        try:
-            object_value = useable_map[2]()
-            object_value.loads(string_value)
-        except IndexError as err:
-            object_value = string_value
-
-        return (new_position, [add_code, object_value])
+    def _build_component(self, add_code, start, end):
+        ''' turn the recorded offsets of an additional field into either a
+    Component Object or a String '''
+        return self.DECODERS[add_code][1](self.raw[start:end])
 
     def remarks(self):
+        ''' the remarks section, parsed the first time it is asked for '''
+        if self._remarks is None:
+            self._remarks = {}
+            raw = self.raw
+            position = raw.find('REM', 108)
+            if position >= 0:
+                try:
+                    self._get_remarks_component(raw, position)
+                except ValueError:
+                    ''' a garbled length, keep what was read so far '''
         return self._remarks
 
     def get_additional_field(self, addl_code):
         ''' Given an additional field code (AA1, AJ1..), return whatever match
     we have available for this code '''
-        return self._additional.get(addl_code)
+        if self._additional is None:
+            self._additional = {}
+        if addl_code not in self._additional:
+            span = self._additional_span(addl_code)
+            if span is None:
+                return None
+            self._additional[addl_code] = self._build_component(addl_code, *span)
+        return self._additional[addl_code]
+
+    def get_additional_text(self, addl_code):
+        ''' the undecoded text of an additional field, or None when the
+    report does not have it '''
+        span = self._additional_span(addl_code)
+        if isinstance(self._additional_offsets, _packed_fields):
+            return span if isinstance(span, str) else None
+        if span is None:
+            return None
+        return self.raw[span[0]:span[1]]
+
+    def additional_codes(self):
+        ''' the codes of the additional fields of this report, in record
+      order, without decoding any of them '''
+        if self._additional_offsets is None or self._additional_resume is not None:
+            self._scan_additional()
+        return tuple(self._additional_offsets)
 
     def additional(self):
         ''' return the entire additional dictionary '''
+        if self._additional_offsets is None or self._additional_resume is not None:
+            self._scan_additional()
+        if self._additional is None or len(self._additional) != len(self._additional_offsets):
+            self._additional = dict((addl_code, self.get_additional_field(addl_code))
+                                    for addl_code in self._additional_offsets)
         return self._additional
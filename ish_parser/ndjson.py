@@ -0,0 +1,154 @@
+''' reports written out as newline delimited json, one toJson() object
+per line, for exports too big for calling toJson() report by report.
+
+the encoder is put together once: the mandatory fields in the order
+toJson uses, and a table from additional code to the list it goes in
+(liquid_precip, sky_cover_condition..) and its place in that list, so a
+report's additional section is walked once and each component decoded
+once. lines are written in chunks of CHUNK_LINES.
+
+with orjson installed it does the serializing, otherwise the json module
+does, which gives lines identical to toJson(). orjson leaves out the
+spaces after separators and writes missing (NaN) values as null, which
+unlike json's NaN is valid json.
+'''
+import io
+import json
+import os
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+from .ish_parser import ish_parser
+from .quarantine import quarantine
+
+CHUNK_LINES = 4096
+
+# the lists toJson adds after the mandatory fields: (key, code prefix, how many)
+GROUPS = (('liquid_precip', 'AA', 4),
+          ('weather_occurence', 'AU', 8),
+          ('weather_condition', 'AW', 5),
+          ('sky_cover_condition', 'GA', 5),
+          ('extreme_temperature', 'KA', 3))
+
+BACKENDS = ('json', 'orjson')
+
+
+def _group_slots(groups):
+  ''' additional code -> (group number, place in the group) '''
+  return dict(('%s%d' % (prefix, place), (number, place))
+              for (number, (key, prefix, count)) in enumerate(groups)
+              for place in range(1, count + 1))
+
+
+def make_encoder(groups=GROUPS):
+  ''' a function turning a report into the dict toJson() serializes '''
+  slots = _group_slots(groups)
+  keys = [key for (key, prefix, count) in groups]
+
+  def encode(report):
+    record = {'weather_station': report.weather_station,
+              'latitude': report.latitude,
+              'longitude': report.longitude,
+              'elevation': report.elevation,
+              'time': report.datetime.isoformat(),
+              'air_temperature': report.air_temperature.asJson(),
+              'dew_point': report.dew_point.asJson(),
+              'wind_speed': report.wind_speed.asJson(),
+              'wind_direction': report.wind_direction.asJson(),
+              'sea_level_pressure': report.sea_level_pressure.asJson(),
+              'sky_ceiling': report.sky_ceiling.asJson(),
+              'visibility_distance': report.visibility_distance.asJson()}
+
+    found = None
+    for addl_code in report.additional_codes():
+      slot = slots.get(addl_code)
+      if slot is not None:
+        if found is None:
+          found = [[] for key in keys]
+        found[slot[0]].append((slot[1], report.get_additional_field(addl_code).toJson()))
+    if found is not None:
+      for (key, values) in zip(keys, found):
+        if values:
+          values.sort(key=_place)
+          record[key] = [value for (place, value) in values]
+    return record
+
+  return encode
+
+
+def _place(item):
+  return item[0]
+
+
+def _serializer(backend):
+  ''' (function from a dict to one encoded line, whether it gives bytes) '''
+  if backend is None:
+    backend = 'orjson' if orjson is not None else 'json'
+  if backend == 'orjson':
+    if orjson is None:
+      raise ImportError('the orjson backend needs orjson, pip install orjson')
+    dumps = orjson.dumps
+    option = orjson.OPT_APPEND_NEWLINE
+    return (lambda record: dumps(record, option=option)), True
+  if backend == 'json':
+    encode = json.JSONEncoder(check_circular=False).encode
+    return (lambda record: encode(record) + '\n'), False
+  raise ValueError('unknown backend %s, expected one of %s' % (backend, ', '.join(BACKENDS)))
+
+
+def _is_text(fh):
+  return isinstance(fh, io.TextIOBase) or 'b' not in getattr(fh, 'mode', 'b')
+
+
+def write_ndjson(reports_or_path, fh, backend=None, errors=None, **options):
+  ''' write reports to the open file fh (text or binary), one json object
+  per line with the content of toJson(). reports_or_path is an iterable
+  of reports or the path of an ish file, which is streamed through an
+  ish_parser built with options. a report with a field that fails to
+  decode is left out and goes to errors (a quarantine, see ish_parser),
+  as do the lines that fail to load. backend is 'json', 'orjson' or None
+  for orjson when it's installed. returns the number of lines written '''
+  if isinstance(reports_or_path, (str, bytes, os.PathLike)):
+    parser = ish_parser(errors=errors, **options)
+    (reports_or_path, reject) = (parser.iter_file(reports_or_path), parser.reject)
+  else:
+    reject = (quarantine() if errors is None else errors).add_report
+  (serialize, gives_bytes) = _serializer(backend)
+  text = _is_text(fh)
+  join = b''.join if gives_bytes else ''.join
+  encode = make_encoder()
+
+  count = 0
+  chunk = []
+  for report in reports_or_path:
+    try:
+      chunk.append(serialize(encode(report)))
+    except Exception as exp:
+      reject(report, exp)
+      continue
+    if len(chunk) == CHUNK_LINES:
+      _write(fh, join(chunk), text)
+      count += len(chunk)
+      chunk = []
+  if chunk:
+    _write(fh, join(chunk), text)
+    count += len(chunk)
+  return count
+
+
+def format_ndjson(backend, reports):
+  ''' (the lines of a stream of reports as one bytes string, how many). a
+  module level function so parse_many can run it in the workers '''
+  fh = io.BytesIO()
+  count = write_ndjson(reports, fh, backend)
+  return fh.getvalue(), count
+
+
+def _write(fh, data, text):
+  if isinstance(data, bytes):
+    fh.write(data.decode('utf-8') if text else data)
+  else:
+    fh.write(data if text else data.encode('utf-8'))
@@ -0,0 +1,245 @@
+''' write parsed reports to a parquet dataset partitioned by station and
+year, through pyarrow.
+
+reports are buffered per partition as plain column lists and written out
+as a record batch every batch_size rows, so memory stays bounded by the
+batch size and the number of partitions open at once, not by the input.
+the layout is hive style, root/station=725300/year=2014/part-00000.parquet,
+which pyarrow.dataset, pandas, duckdb and spark all read directly.
+'''
+import os
+
+from .ish_parser import ish_parser
+from .quarantine import quarantine
+from .frame import OBSERVATIONS, missing_to_nan
+from .timestamp import to_datetime
+
+try:
+  import pyarrow as pa
+  import pyarrow.dataset
+  import pyarrow.parquet as pq
+except ImportError:
+  pa = None
+
+
+def _require_pyarrow():
+  if pa is None:
+    raise ImportError('the parquet writer needs pyarrow, pip install pyarrow')
+
+
+def _precipitation(component):
+  return {'hours': component.precipitation['hours'],
+          'depth': component.precipitation['depth'].get_numeric()}
+
+
+def _weather_occurrence(component):
+  return component.toJson()
+
+
+def _sky_cover(component):
+  return component.toJson()
+
+
+def _extreme_temperature(component):
+  temperature = component.extreme_temperature['temperature']
+  return {'hours': component.extreme_temperature['hours'],
+          'code': component.extreme_temperature['code'],
+          'temperature': temperature.get_numeric(),
+          'quality': temperature._obs_quality}
+
+
+# repeated additional groups, stored as list<struct> columns:
+# column -> (codes, struct fields, component -> dict)
+GROUPS = {
+  'liquid_precip': (['AA%d' % i for i in range(1, 5)],
+                    [('hours', 'int16'), ('depth', 'float64')],
+                    _precipitation),
+  'weather_occurrence': (['AU%d' % i for i in range(1, 10)],
+                         [('intensity', 'string'), ('descriptor', 'string'),
+                          ('precipitation', 'string'), ('obscuration', 'string')],
+                         _weather_occurrence),
+  'sky_cover': (['GA%d' % i for i in range(1, 7)],
+                [('coverage', 'float64'), ('base_height', 'float64'),
+                 ('cloud_type', 'string')],
+                _sky_cover),
+  'extreme_temperature': (['KA%d' % i for i in range(1, 5)],
+                          [('hours', 'int16'), ('code', 'string'),
+                           ('temperature', 'float64'), ('quality', 'string')],
+                          _extreme_temperature),
+}
+
+
+def schema():
+  ''' the arrow schema of the written files. station and year are the
+  partition keys and live in the directory names, not in the files '''
+  _require_pyarrow()
+  dictionary = pa.dictionary(pa.int32(), pa.string())
+  fields = [pa.field('wban', dictionary),
+            pa.field('datetime', pa.timestamp('ms', tz='UTC')),
+            pa.field('report_type', dictionary),
+            pa.field('latitude', pa.float64()),
+            pa.field('longitude', pa.float64()),
+            pa.field('elevation', pa.int32())]
+  for name in OBSERVATIONS:
+    fields.append(pa.field(name, pa.float64()))
+    fields.append(pa.field(name + '_quality', dictionary))
+  for (name, (codes, struct, convert)) in GROUPS.items():
+    members = [pa.field(member, pa.type_for_alias(kind)) for (member, kind) in struct]
+    fields.append(pa.field(name, pa.list_(pa.struct(members))))
+  return pa.schema(fields)
+
+
+def _year(timestamp):
+  ''' calendar year (UTC) of epoch seconds '''
+  return to_datetime(timestamp).year
+
+
+class _partition(object):
+  ''' column buffers for one station-year '''
+
+  def __init__(self, names):
+    self.columns = dict((name, []) for name in names)
+    # the same lists in schema order, for appending a row
+    self.ordered = [self.columns[name] for name in names]
+    self.rows = 0
+    self.writer = None
+
+
+class ish_parquet_writer(object):
+  ''' buffers reports and writes them to a partitioned parquet dataset.
+  use as a context manager, or call close() to flush what is left '''
+
+  def __init__(self, root, batch_size=50000, max_open_partitions=64,
+               compression='snappy'):
+    _require_pyarrow()
+    self.root = root
+    self.batch_size = batch_size
+    self.max_open_partitions = max_open_partitions
+    self.compression = compression
+    self.schema = schema()
+    self._partitions = {}
+    self._parts = {}
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def write(self, report):
+    ''' buffer a report. the whole row is decoded before anything is
+    buffered, so a report with a malformed field raises and leaves the
+    partition as it was '''
+    timestamp = report.timestamp
+    key = (report.weather_station, _year(timestamp))
+    row = [report.wban, timestamp * 1000, report.report_type._obs_value,
+           report.latitude, report.longitude, report.elevation]
+    for name in OBSERVATIONS:
+      observation = getattr(report, name)
+      row.append(observation._obs_value)
+      row.append(observation._obs_quality)
+    for (name, (codes, struct, convert)) in GROUPS.items():
+      values = []
+      for code in codes:
+        component = report.get_additional_field(code)
+        if component is not None:
+          values.append(convert(component))
+      row.append(values)
+
+    partition = self._partitions.get(key)
+    if partition is None:
+      if len(self._partitions) >= self.max_open_partitions:
+        self._close_oldest()
+      partition = self._partitions[key] = _partition(self.schema.names)
+    for (values, value) in zip(partition.ordered, row):
+      values.append(value)
+
+    partition.rows += 1
+    if partition.rows >= self.batch_size:
+      self._flush(key, partition)
+
+  def write_all(self, reports):
+    for report in reports:
+      self.write(report)
+
+  def _batch(self, partition):
+    arrays = []
+    for field in self.schema:
+      values = partition.columns[field.name]
+      if field.name in OBSERVATIONS:
+        values = missing_to_nan(values, OBSERVATIONS[field.name].MISSING)
+        arrays.append(pa.array(values, type=field.type, from_pandas=True))
+      elif pa.types.is_dictionary(field.type):
+        arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+      else:
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+  def _flush(self, key, partition):
+    if not partition.rows:
+      return
+    if partition.writer is None:
+      partition.writer = pq.ParquetWriter(self._part_path(key), self.schema,
+                                          compression=self.compression)
+    partition.writer.write_batch(self._batch(partition))
+    for values in partition.columns.values():
+      del values[:]
+    partition.rows = 0
+
+  def _part_path(self, key):
+    (station, year) = key
+    directory = os.path.join(self.root, 'station=%s' % station, 'year=%d' % year)
+    if not os.path.isdir(directory):
+      os.makedirs(directory)
+    part = self._parts.get(key, 0)
+    while os.path.exists(os.path.join(directory, 'part-%05d.parquet' % part)):
+      part += 1
+    self._parts[key] = part + 1
+    return os.path.join(directory, 'part-%05d.parquet' % part)
+
+  def _close_partition(self, key):
+    partition = self._partitions.pop(key)
+    self._flush(key, partition)
+    if partition.writer is not None:
+      partition.writer.close()
+
+  def _close_oldest(self):
+    self._close_partition(next(iter(self._partitions)))
+
+  def close(self):
+    for key in list(self._partitions):
+      self._close_partition(key)
+
+
+def write_parquet(source, root, errors=None, **kwargs):
+  ''' parse source (a path or file object, plain or compressed, or an
+  iterable of ish_reports) straight into a parquet dataset under root.
+  lines that fail to load, and reports with a field that fails to decode
+  while being written, are left out and go to errors (a quarantine, see
+  ish_parser). keyword arguments go to ish_parquet_writer. returns the
+  report count '''
+  if hasattr(source, 'read') or isinstance(source, (str, bytes, os.PathLike)):
+    parser = ish_parser(errors=errors)
+    (source, reject) = (parser.iter_file(source), parser.reject)
+  else:
+    reject = (quarantine() if errors is None else errors).add_report
+
+  count = 0
+  with ish_parquet_writer(root, **kwargs) as writer:
+    for report in source:
+      try:
+        writer.write(report)
+      except Exception as exp:
+        reject(report, exp)
+        continue
+      count += 1
+  return count
+
+
+def read_dataset(root):
+  ''' open a dataset written by write_parquet. the station partition key
+  is read back as a string so leading zeros (010060) survive '''
+  _require_pyarrow()
+  partitioning = pa.dataset.partitioning(
+    pa.schema([('station', pa.string()), ('year', pa.int16())]), flavor='hive')
+  return pa.dataset.dataset(root, format='parquet', partitioning=partitioning)
@@ -0,0 +1,96 @@
+''' where the lines that fail to load go.
+
+the parser used to log a warning per bad line, which on a dirty
+historical file is thousands of log records. instead every rejected
+line is handed to a quarantine with where it came from (file, byte
+offset) and a short reason code:
+
+  length        the length in the header does not match the line
+  unknown_code  the additional section has a code the parser doesn't know
+  bad_value     a field could not be decoded (a ValueError)
+  error         anything else
+
+loading checks the length and walks the additional section for unknown
+codes, but the additional fields are only built when they are used. a
+report whose field turns out malformed then raises, and whoever was
+decoding it sends it here with ish_parser.reject (or add_report when
+there is no parser), so the line is rejected after all.
+
+the first max_lines are kept in memory, all of them are counted, and
+with a path each one is also appended to that file as a line of json.
+max_errors is an error budget: once more lines than that are rejected,
+the parser stops with ErrorBudgetExceeded instead of ploughing on
+through a file that is clearly not what it expected.
+'''
+import json
+from collections import Counter, namedtuple
+
+MAX_LINES = 1000
+
+rejected_line = namedtuple('rejected_line', 'source offset reason message line')
+
+
+class ErrorBudgetExceeded(Exception):
+  ''' raised once a quarantine has taken more than max_errors lines '''
+
+
+def reason_of(exp):
+  ''' the reason code of an exception raised while loading a line '''
+  reason = getattr(exp, 'reason', None)
+  if reason is not None:
+    return reason
+  return 'bad_value' if isinstance(exp, ValueError) else 'error'
+
+
+class quarantine(object):
+  ''' collects rejected lines, see the module docstring. use as a context
+  manager or call close() when writing to a path '''
+
+  def __init__(self, path=None, max_lines=MAX_LINES, max_errors=None):
+    self.path = path
+    self.max_lines = max_lines
+    self.max_errors = max_errors
+    self.lines = []
+    self.reasons = Counter()
+    self.total = 0
+    self._fp = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def close(self):
+    if self._fp is not None:
+      self._fp.close()
+      self._fp = None
+
+  def add(self, source, offset, reason, message, line):
+    ''' record a rejected line, raising ErrorBudgetExceeded when that
+    goes over max_errors '''
+    self.total += 1
+    self.reasons[reason] += 1
+    record = rejected_line(source, offset, reason, message, line)
+    if len(self.lines) < self.max_lines:
+      self.lines.append(record)
+    if self.path is not None:
+      if self._fp is None:
+        self._fp = open(self.path, 'a', encoding='utf-8')
+      self._fp.write(json.dumps(record._asdict()) + '\n')
+    if self.max_errors is not None and self.total > self.max_errors:
+      self.close()
+      raise ErrorBudgetExceeded('more than %d lines rejected, the last at %s:%s (%s)' % (
+        self.max_errors, source, offset, reason))
+
+  def add_report(self, report, exp, source=None, offset=None):
+    ''' record a report that loaded but raised exp when one of its fields
+    was decoded later '''
+    self.add(source, offset, reason_of(exp), str(exp), report.raw)
+
+  def __len__(self):
+    return self.total
+
+  def __repr__(self):
+    return 'quarantine(%d lines: %s)' % (self.total, ', '.join(
+      '%s %d' % item for item in self.reasons.most_common()))
@@ -0,0 +1,109 @@
+''' counters and timings of what the parser does, for when throughput
+drops and it isn't clear where the time goes.
+
+hand a parse_stats to ish_parser(stats=...) and it records the lines and
+bytes read, the lines dropped and why, the additional codes seen and the
+time ish_report.loads spends in each stage:
+
+  timestamp     decoding the observation time
+  mandatory     the other fixed position fields
+  additional    walking the additional section
+  components    building Component objects, per code in code_seconds
+  remarks       splitting the remarks section
+
+loads leaves components and remarks for later unless the reports are
+compact, so those two stay at zero unless decode_all is set, which
+decodes them while the clock runs. without stats the parser takes none
+of these paths, the only cost is a check for None per line.
+'''
+import time
+from collections import Counter
+
+STAGES = ('timestamp', 'mandatory', 'additional', 'components', 'remarks')
+
+
+class parse_stats(object):
+  ''' what one or more parsers did. callback, when given, is called with
+  the stats every interval lines, for progress or periodic logging '''
+
+  def __init__(self, callback=None, interval=10000, decode_all=False, clock=time.perf_counter):
+    self.callback = callback
+    self.interval = interval
+    self.decode_all = decode_all
+    self.clock = clock
+    self.reset()
+
+  def reset(self):
+    ''' start counting from zero '''
+    self.lines = 0
+    self.bytes = 0
+    self.reports = 0
+    self.rejected = Counter()
+    self.seconds = dict.fromkeys(STAGES, 0.0)
+    self.codes = Counter()
+    self.code_seconds = Counter()
+
+  def line(self, size):
+    ''' a line of size bytes was read '''
+    self.lines += 1
+    self.bytes += size
+    if self.callback is not None and self.lines % self.interval == 0:
+      self.callback(self)
+
+  def reject(self, reason):
+    ''' a line was dropped, for one of these reasons:
+
+      short         too short to be a record, skipped before loading
+      filtered      left out by the record filters, before loading
+      length, unknown_code, bad_value, error
+                    the line went to the quarantine, see quarantine.py.
+                    this includes reports rejected after loading
+                    (ish_parser.reject) '''
+    self.rejected[reason] += 1
+
+  def add_time(self, stage, seconds):
+    self.seconds[stage] += seconds
+
+  def add_codes(self, codes):
+    ''' the additional codes found in a report '''
+    self.codes.update(codes)
+
+  def add_code_time(self, code, seconds):
+    self.code_seconds[code] += seconds
+    self.seconds['components'] += seconds
+
+  def merge(self, other):
+    ''' add the counts and timings of another parse_stats, e.g. one per
+    worker thread '''
+    self.lines += other.lines
+    self.bytes += other.bytes
+    self.reports += other.reports
+    self.rejected.update(other.rejected)
+    for (stage, seconds) in other.seconds.items():
+      self.seconds[stage] += seconds
+    self.codes.update(other.codes)
+    self.code_seconds.update(other.code_seconds)
+    return self
+
+  def as_dict(self):
+    ''' everything as plain dicts and numbers, ready for json '''
+    return {'lines': self.lines, 'bytes': self.bytes, 'reports': self.reports,
+            'rejected': dict(self.rejected), 'seconds': dict(self.seconds),
+            'codes': dict(self.codes), 'code_seconds': dict(self.code_seconds)}
+
+  def summary(self):
+    ''' a short human readable report '''
+    lines = ['%d lines, %d bytes, %d reports' % (self.lines, self.bytes, self.reports)]
+    if self.rejected:
+      lines.append('rejected: ' + ', '.join('%s %d' % item for item in self.rejected.most_common()))
+    for stage in STAGES:
+      lines.append('%-12s %10.3f s' % (stage, self.seconds[stage]))
+    for (code, count) in self.codes.most_common():
+      seconds = self.code_seconds.get(code)
+      lines.append('  %-10s %8d' % (code, count) +
+                   ('' if seconds is None else '  %10.6f s' % seconds))
+    return '\n'.join(lines)
+
+  def __repr__(self):
+    return 'parse_stats(lines=%d, reports=%d, rejected=%d)' % (
+      self.lines, self.reports, sum(self.rejected.values()))
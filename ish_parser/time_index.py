@@ -0,0 +1,124 @@
+''' seeking by time inside an ish file.
+
+records in a station-year file are in time order, so the first record
+of a time range can be found by bisection instead of parsing from the
+top. a sidecar index (<file>.idx) records (epoch minute, byte offset)
+for every line, or every Nth, which makes that a bisect over two int64
+arrays. without an index the mapped file itself is bisected.
+
+the index holds the size and mtime of the file it was built from and
+is ignored once those no longer match.
+'''
+import bisect
+import os
+from array import array
+
+from .ish_file import ENCODING, map_file, line_spans
+from .timestamp import epoch_seconds
+
+INDEX_SUFFIX = '.idx'
+MAGIC = b'ISHIDX01'
+HEADER_LENGTH = 3
+PREAMBLE_LENGTH = 105
+
+
+def _line_stamp(buffer, start):
+  ''' the YYYYMMDDHHMM bytes of the record starting at start '''
+  return buffer[start + 15:start + 27]
+
+
+def _fingerprint(path):
+  stat = os.stat(path)
+  return (stat.st_size, stat.st_mtime_ns)
+
+
+def build_index(path, every=1, index_path=None):
+  ''' write the sidecar index of a plain (uncompressed) ish file, with an
+  entry for every line, or every Nth. returns the index path '''
+  mapping = map_file(path)
+  if mapping is None:
+    raise ValueError('%s is compressed or empty, only plain files can be indexed' % path)
+  index_path = index_path or path + INDEX_SUFFIX
+
+  entries = array('q')
+  for (number, (start, stop)) in enumerate(line_spans(mapping)):
+    if number % every or stop - start < PREAMBLE_LENGTH:
+      continue
+    try:
+      minute = epoch_seconds(str(_line_stamp(mapping, start), ENCODING)) // 60
+    except ValueError:
+      continue
+    entries.append(minute)
+    entries.append(start)
+  mapping.close()
+
+  header = array('q', _fingerprint(path) + (every,))
+  with open(index_path, 'wb') as fp:
+    fp.write(MAGIC)
+    fp.write(header.tobytes())
+    fp.write(entries.tobytes())
+  return index_path
+
+
+def read_index(path, index_path=None):
+  ''' the (minutes, offsets) arrays of the index of path, or None when
+  there is no index or it is out of date '''
+  index_path = index_path or path + INDEX_SUFFIX
+  try:
+    with open(index_path, 'rb') as fp:
+      content = fp.read()
+  except FileNotFoundError:
+    return None
+  if not content.startswith(MAGIC):
+    return None
+
+  values = array('q')
+  values.frombytes(content[len(MAGIC):])
+  if tuple(values[0:2]) != _fingerprint(path):
+    return None
+  entries = values[HEADER_LENGTH:]
+  return entries[0::2], entries[1::2]
+
+
+def _next_line(buffer, position):
+  ''' offset of the first line starting at or after position '''
+  if position == 0:
+    return 0
+  newline = buffer.find(b'\n', position - 1)
+  return len(buffer) if newline < 0 else newline + 1
+
+
+def _bisect_file(buffer, stamp):
+  ''' offset of the first line whose time is not before stamp '''
+  (low, high) = (0, len(buffer))
+  while low < high:
+    middle = (low + high) // 2
+    start = _next_line(buffer, middle)
+    if start >= len(buffer) or _line_stamp(buffer, start) >= stamp:
+      high = middle
+    else:
+      low = middle + 1
+  return _next_line(buffer, low)
+
+
+def seek(buffer, stamp, index=None):
+  ''' a line offset at or before the first record whose time is not
+  before stamp (YYYYMMDDHHMM bytes) '''
+  if index is None:
+    return _bisect_file(buffer, stamp)
+  (minutes, offsets) = index
+  position = bisect.bisect_left(minutes, epoch_seconds(str(stamp, ENCODING)) // 60)
+  return offsets[position - 1] if position > 0 else 0
+
+
+def range_spans(buffer, start=None, end=None, index=None):
+  ''' (start, stop) of the lines with start <= time < end, both bounds
+  YYYYMMDDHHMM bytes or None for an open end '''
+  offset = 0 if start is None else seek(buffer, start, index)
+  for (begin, stop) in line_spans(buffer, offset):
+    stamp = _line_stamp(buffer, begin)
+    if end is not None and stamp >= end:
+      break
+    if start is not None and stamp < start:
+      continue
+    yield (begin, stop)
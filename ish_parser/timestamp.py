@@ -0,0 +1,46 @@
+''' decoding of the YYYYMMDDHHMM observation time into epoch seconds.
+
+the date part is turned into a day number through a small cache (a
+station-year only has a few hundred distinct days) and the time of day
+is plain arithmetic, so NOAA's occasional 2400 hour simply becomes
+midnight of the next day. stdlib datetimes are only built on request.
+'''
+from datetime import date, datetime, timedelta, timezone
+
+SECONDS_PER_DAY = 86400
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# day number by YYYYMMDD. cleared when it grows past the limit, which is
+# a few decades of days and far more than one file ever needs
+MAX_CACHED_DAYS = 16384
+_days = {}
+
+
+def epoch_day(yyyymmdd):
+  ''' days since 1970-01-01 of a YYYYMMDD string. raises ValueError for
+  a date that does not exist '''
+  day = _days.get(yyyymmdd)
+  if day is None:
+    day = date(int(yyyymmdd[0:4]), int(yyyymmdd[4:6]),
+               int(yyyymmdd[6:8])).toordinal() - EPOCH_ORDINAL
+    if len(_days) >= MAX_CACHED_DAYS:
+      _days.clear()
+    _days[yyyymmdd] = day
+  return day
+
+
+def epoch_seconds(stamp):
+  ''' seconds since the epoch (UTC) of a YYYYMMDDHHMM string '''
+  hour = int(stamp[8:10])
+  minute = int(stamp[10:12])
+  # 2400 is midnight of the next day, 2430 is not a time
+  if minute > 59 or hour > 24 or (hour == 24 and minute):
+    raise ValueError('time out of range in %s' % stamp)
+  return epoch_day(stamp[0:8]) * SECONDS_PER_DAY + hour * 3600 + minute * 60
+
+
+def to_datetime(seconds):
+  ''' a timezone aware (UTC) datetime for epoch seconds. fromtimestamp
+  raises for times before 1970 on windows, this doesn't '''
+  return EPOCH + timedelta(seconds=seconds)
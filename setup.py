@@ -7,4 +7,10 @@ setup(name='ish_parser',
   author='thayden',
   url='https://github.com/haydenth/ish_parser',
   packages=find_packages(exclude=['contrib', 'docs', 'tests']),
-  py_modules=['ish_parser', 'ish_report'])
+  py_modules=['ish_parser', 'ish_report'],
+  install_requires=[],
+  extras_require={'numpy': ['numpy'],
+                  'pandas': ['numpy', 'pandas'],
+                  'parquet': ['numpy', 'pyarrow'],
+                  'orjson': ['orjson']},
+  entry_points={'console_scripts': ['ish = ish_parser.cli:main']})
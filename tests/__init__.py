@@ -5,3 +5,19 @@ from .ComponentTest import SkyConditionObservationComponentTest, SkyCoverSummati
 from .Humidity_test import Humidity_test
 from .remarks_test import remarks_test
 from .Minutes_test import Minutes_test
+from .ish_file_test import ish_file_test
+from .bulk_test import bulk_test
+from .columnar_test import columnar_test
+from .frame_test import frame_test
+from .parquet_test import parquet_test
+from .timestamp_test import timestamp_test
+from .filters_test import filters_test
+from .time_index_test import time_index_test
+from .catalog_test import catalog_test
+from .cache_test import cache_test
+from .aio_test import aio_test
+from .stats_test import stats_test
+from .quarantine_test import quarantine_test
+from .ndjson_test import ndjson_test
+from .csv_export_test import csv_export_test
+from .cli_test import cli_test
@@ -0,0 +1,60 @@
+import asyncio
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from ish_parser import aiter_reports, gather_files, ish_report, quarantine
+from ish_parser.bulk import count_reports
+from .bad_lines import read_lines, unknown_code, write_lines
+
+class aio_test(unittest.TestCase):
+
+  AT1_ERROR = 'tests/726430-14920-2015'
+  OTHER_RANDOM = 'tests/010060-99999-2014'
+
+  def _collect(self, source, **kwargs):
+    async def collect():
+      return [report async for report in aiter_reports(source, **kwargs)]
+    return asyncio.run(collect())
+
+  def test_aiter_reports(self):
+    reports = self._collect(self.AT1_ERROR, batch_size=50)
+    self.assertEqual(len(reports), 154)
+    self.assertEqual(type(reports[0]), ish_report)
+    self.assertEqual(reports[0].weather_station, '726430')
+
+  def test_compressed_file_object_and_options(self):
+    with open(self.AT1_ERROR, 'rb') as fp:
+      fileobj = io.BytesIO(gzip.compress(fp.read()))
+    reports = self._collect(fileobj, lazy=True, report_types=['FM-15'])
+    self.assertTrue(reports)
+    self.assertTrue(all(report.report_type == 'FM-15' for report in reports))
+
+  def test_process_pool(self):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+      reports = self._collect(self.AT1_ERROR, executor=executor, batch_size=40)
+    self.assertEqual(len(reports), 154)
+
+  def test_gather_files(self):
+    paths = [self.OTHER_RANDOM, 'tests/does-not-exist', self.AT1_ERROR]
+    results = asyncio.run(gather_files(paths, limit=2, func=count_reports))
+    self.assertEqual([result.path for result in results], paths)
+    self.assertEqual(results[0].value, 2816)
+    self.assertFalse(results[1].ok)
+    self.assertEqual(results[2].value, 154)
+
+  def test_one_quarantine(self):
+    lines = read_lines(self.AT1_ERROR)
+    lines[7] = lines[7][:-1]
+    lines[100] = unknown_code(lines[100])
+    path = write_lines(os.path.join(tempfile.mkdtemp(), 'bad'), lines)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+      for pool in (None, executor):
+        errors = quarantine()
+        reports = self._collect(path, executor=pool, batch_size=40, errors=errors)
+        self.assertEqual(len(reports), 152)
+        self.assertEqual([(line.source, line.reason, line.offset) for line in errors.lines],
+                         [(path, 'length', sum(len(line) + 1 for line in lines[:7])),
+                          (path, 'unknown_code', sum(len(line) + 1 for line in lines[:100]))])
@@ -0,0 +1,32 @@
+''' fixture lines broken on purpose, for the tests of everything that has
+to get past a bad line '''
+from ish_parser import ish_report
+
+
+def _with_length(line):
+  ''' the line with its header length fixed up '''
+  return '%04d' % (len(line) - ish_report.PREAMBLE_LENGTH) + line[4:]
+
+
+def unknown_code(line):
+  ''' the line with an additional field the parser doesn't know (ZZ9) in
+  front of the others. it raises once the additional section is walked '''
+  return _with_length(line.replace('ADD', 'ADDZZ9', 1))
+
+
+def bad_component(line):
+  ''' the line with a GA1 base height that isn't a number. the additional
+  section walks fine, building the GA1 component raises ValueError '''
+  start = line.index('GA1') + 3
+  return line[:start + 4] + '+00A79' + line[start + 10:]
+
+
+def read_lines(path, count=None):
+  with open(path) as fp:
+    return fp.read().splitlines()[:count]
+
+
+def write_lines(path, lines):
+  with open(path, 'w') as fp:
+    fp.write('\n'.join(lines) + '\n')
+  return path
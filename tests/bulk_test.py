@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ish_parser import parse_many, ish_report
+from ish_parser.bulk import count_reports, expand_paths
+from .bad_lines import bad_component, read_lines, unknown_code, write_lines
+
+class bulk_test(unittest.TestCase):
+
+  AT1_ERROR = 'tests/726430-14920-2015'
+  OTHER_RANDOM = 'tests/010060-99999-2014'
+
+  def test_results_in_input_order(self):
+    paths = [self.AT1_ERROR, self.OTHER_RANDOM, self.AT1_ERROR]
+    results = list(parse_many(paths, workers=2, func=count_reports))
+    self.assertEqual([r.path for r in results], paths)
+    self.assertEqual([r.value for r in results], [154, 2816, 154])
+
+  def test_long_batch_in_order(self):
+    # more files than fit in flight, big ones scheduled ahead of small ones
+    paths = [self.AT1_ERROR] * 5 + [self.OTHER_RANDOM] * 3 + [self.AT1_ERROR] * 2
+    results = list(parse_many(paths, workers=2, func=count_reports))
+    self.assertEqual([r.path for r in results], paths)
+    self.assertEqual([r.value for r in results], [154] * 5 + [2816] * 3 + [154] * 2)
+
+  def test_reports_cross_process(self):
+    results = list(parse_many([self.AT1_ERROR], workers=2))
+    self.assertEqual(len(results[0].value), 154)
+    self.assertEqual(type(results[0].value[0]), ish_report)
+    self.assertEqual(results[0].value[0].weather_station, '726430')
+
+  def test_failure_does_not_abort(self):
+    paths = ['tests/does-not-exist', self.AT1_ERROR]
+    results = list(parse_many(paths, workers=1, func=count_reports))
+    self.assertFalse(results[0].ok)
+    self.assertIn('FileNotFoundError', results[0].error)
+    self.assertEqual(results[1].value, 154)
+
+  def test_expand_glob(self):
+    self.assertEqual(expand_paths(['tests/7264*']), [self.AT1_ERROR])
+
+  def test_unordered(self):
+    paths = [self.AT1_ERROR, self.OTHER_RANDOM] * 3
+    results = list(parse_many(paths, workers=2, func=count_reports, ordered=False))
+    self.assertEqual(sorted((r.path, r.value) for r in results),
+                     sorted(zip(paths, [154, 2816] * 3)))
+
+  def test_bad_line_does_not_abort(self):
+    # lazy reports decode their additional section in func, a bad line
+    # raises there and fails only its own file
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory)
+    (line,) = read_lines(self.AT1_ERROR, 1)
+    for (breaks, error) in ((unknown_code, 'ish_reportException'), (bad_component, 'ValueError')):
+      path = write_lines(os.path.join(directory, breaks.__name__), [line, breaks(line), line])
+      results = list(parse_many([path, self.AT1_ERROR], workers=1, func=_additional, lazy=True))
+      self.assertFalse(results[0].ok)
+      self.assertIn(error, results[0].error)
+      self.assertEqual(results[1].value, 154)
+
+
+def _additional(reports):
+  ''' counts reports, decoding the additional fields of each '''
+  return sum(1 for report in reports if report.additional() is not None)
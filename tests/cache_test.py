@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ish_parser import ish_parser, read_columns
+from ish_parser.columnar import np
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class cache_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300.txt'
+  OTHER_BUG = 'tests/723030-13714-1973'
+
+  def setUp(self):
+    from ish_parser.cache import parse_cache
+    self.directory = tempfile.mkdtemp()
+    self.cache = parse_cache(os.path.join(self.directory, 'cache'))
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def test_cold_and_warm_match(self):
+    from ish_parser.cache import additional_text
+    plain = read_columns(self.OTHER_BUG)
+    cold = read_columns(self.OTHER_BUG, cache=self.cache)
+    warm = read_columns(self.OTHER_BUG, cache=self.cache)
+    for name in plain:
+      self.assertTrue(np.array_equal(plain[name], cold[name]), name)
+      self.assertTrue(np.array_equal(cold[name], warm[name]), name)
+
+    reports = list(ish_parser().iter_file(self.ORD_FILE))
+    columns = read_columns(self.ORD_FILE, cache=self.cache)
+    for row in (0, 17, len(reports) - 1):
+      self.assertEqual(additional_text(columns, row), reports[row].raw[105:])
+
+  def test_touched_file_hits_by_content(self):
+    path = os.path.join(self.directory, 'station')
+    shutil.copy(self.ORD_FILE, path)
+    read_columns(path, cache=self.cache)
+    entries = self.cache.size()
+    os.utime(path, ns=(0, 0))
+    read_columns(path, cache=self.cache)
+    self.assertEqual(self.cache.size(), entries)
+
+  def test_eviction(self):
+    read_columns(self.ORD_FILE, cache=self.cache)
+    self.cache.max_bytes = self.cache.size() + 1
+    read_columns(self.OTHER_BUG, cache=self.cache)
+    self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+    self.assertEqual(len(read_columns(self.OTHER_BUG, cache=self.cache)['datetime']), 8580)
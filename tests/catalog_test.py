@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ish_parser.catalog import ish_catalog, distance
+from .bad_lines import bad_component, read_lines, unknown_code, write_lines
+
+class catalog_test(unittest.TestCase):
+
+  FIXTURES = 'tests/[0-9]*'
+
+  def setUp(self):
+    (handle, self.database) = tempfile.mkstemp(suffix='.sqlite')
+    os.close(handle)
+    self.catalog = ish_catalog(self.database)
+    self.catalog.build([self.FIXTURES], workers=1)
+
+  def tearDown(self):
+    self.catalog.close()
+    os.remove(self.database)
+
+  def test_entries(self):
+    (entry,) = self.catalog.files(station='722540', year=2014)
+    self.assertEqual(entry['path'], 'tests/722540-13904-2014')
+    self.assertEqual(entry['wban'], '13904')
+    self.assertEqual(entry['reports'], sum(entry['report_types'].values()))
+    self.assertIn('FM-15', entry['report_types'])
+    self.assertIn('AA1', entry['codes'])
+    self.assertLess(entry['first_time'], entry['last_time'])
+
+  def test_unchanged_files_skipped(self):
+    self.assertEqual(self.catalog.build([self.FIXTURES], workers=1), 0)
+
+  def test_nearest(self):
+    # o'hare; the two 725300 files are one station
+    stations = self.catalog.nearest(41.98, -87.9, k=2)
+    self.assertEqual([station['station'] for station in stations], ['725300', '726430'])
+    self.assertEqual(len(stations[0]['files']), 2)
+    self.assertLess(stations[0]['distance'], 5)
+
+    stations = self.catalog.nearest(41.98, -87.9, k=1, years=[2014])
+    self.assertEqual(stations[0]['files'], ['tests/725300.txt'])
+    self.assertEqual(len(self.catalog.nearest(0, 0, k=100)), len(set(
+      (entry['station'], entry['wban']) for entry in self.catalog.files())))
+
+  def test_distance(self):
+    self.assertAlmostEqual(distance(0, 179.5, 0, -179.5), 111.2, places=1)
+
+  def test_bad_line_left_out(self):
+    # an unknown additional code only shows up once a lazy report walks
+    # its additional section, in summarize. a bad component is never
+    # built, the catalog only needs the codes
+    lines = read_lines('tests/726430-14920-2015', 51)
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory)
+    for (breaks, count) in ((unknown_code, 50), (bad_component, 51)):
+      path = write_lines(os.path.join(directory, '726430-14920-2015'),
+                         lines[:50] + [breaks(lines[50])])
+      for workers in (1, 2):
+        with ish_catalog(os.path.join(directory, '%s-%d.sqlite' % (breaks.__name__, workers))) as catalog:
+          self.assertEqual(catalog.build([path], workers=workers), 1)
+          (entry,) = catalog.files()
+          self.assertEqual(entry['reports'], count)
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from ish_parser import ish_parser
+from ish_parser.cli import main, _time
+from .bad_lines import bad_component, read_lines, unknown_code, write_lines
+
+class cli_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+  KORD_FILE = 'tests/725300.txt'
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.directory)
+
+  def output(self, name):
+    return os.path.join(self.directory, name)
+
+  def test_convert_csv(self):
+    out = self.output('out.csv')
+    self.assertEqual(main(['convert', self.KORD_FILE, '--report-type', 'FM-15', '-o', out,
+                           '--columns', 'datetime,air_temperature:fahrenheit']), 0)
+    with open(out) as fp:
+      lines = fp.read().splitlines()
+    self.assertEqual(lines[0], 'datetime,air_temperature:fahrenheit')
+    self.assertEqual(len(lines) - 1, 2692)
+
+  def test_convert_ndjson_jobs(self):
+    out = self.output('out.json')
+    self.assertEqual(main(['convert', '-f', 'ndjson', '-j', '2', self.ORD_FILE, self.KORD_FILE,
+                           '--start', '19830704', '--end', '2014-01-02', '-o', out]), 0)
+    with open(out) as fp:
+      records = [json.loads(line) for line in fp]
+    expected = ish_parser(start=_time('19830704'), end=_time('2014-01-02'))
+    count = sum(len(list(expected.iter_file(path))) for path in (self.ORD_FILE, self.KORD_FILE))
+    self.assertEqual(len(records), count)
+    self.assertEqual(records[0]['time'], '1983-07-04T00:00:00+00:00')
+
+  def test_malformed_line(self):
+    # the second line gets an unknown additional code or a GA1 that isn't a
+    # number, which only show up once the additional section is walked or
+    # GA1 is built
+    lines = read_lines(self.KORD_FILE, 51)
+    try:
+      import pyarrow
+    except ImportError:
+      pyarrow = None
+    for breaks in (unknown_code, bad_component):
+      path = write_lines(self.output('725300-94846-2014'), lines[:1] + [breaks(lines[1])] + lines[2:])
+
+      # the default csv columns don't need the additional section, so the
+      # line is only rejected by the others. csv has a header
+      for (command, count) in ((['-f', 'csv'], 52), (['--columns', 'GA1.base_height'], 51),
+                               (['-f', 'ndjson'], 50), (['-f', 'ndjson', '-j', '2'], 50)):
+        out = self.output('out')
+        self.assertEqual(main(['convert', path, '-o', out] + command), 0)
+        with open(out) as fp:
+          self.assertEqual(len(fp.read().splitlines()), count)
+      if pyarrow is not None:
+        dataset = self.output('dataset-' + breaks.__name__)
+        self.assertEqual(main(['convert', path, '-f', 'parquet', '-o', dataset]), 0)
+        from ish_parser.parquet import read_dataset
+        self.assertEqual(read_dataset(dataset).to_table().num_rows, 50)
+
+    path = write_lines(self.output('725300-94846-2014'), [unknown_code(lines[0])] + lines[1:])
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+      self.assertEqual(main(['stats', '--json', path]), 0)
+    summary = json.loads(stdout.getvalue())
+    self.assertEqual((summary['reports'], summary['rejected']), (50, 1))
+
+  def test_filter(self):
+    out = self.output('out.txt')
+    self.assertEqual(main(['filter', self.ORD_FILE, '--report-type', 'SY-SA', '-o', out]), 0)
+    with open(out) as fp:
+      lines = fp.read().splitlines()
+    self.assertEqual(len(lines), 1294)
+    self.assertTrue(all(line[41:46] == 'SY-SA' for line in lines))
+
+  def test_stats(self):
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+      self.assertEqual(main(['stats', '--json', self.KORD_FILE]), 0)
+    summary = json.loads(stdout.getvalue())
+    self.assertEqual(summary['reports'], 4262)
+    self.assertEqual(summary['station'], '725300')
+
+  def test_index(self):
+    path = self.output('725300.txt')
+    shutil.copy(self.KORD_FILE, path)
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(main(['index', path]), 0)
+    self.assertTrue(os.path.exists(path + '.idx'))
+
+  def test_time(self):
+    self.assertEqual(_time('2014'), datetime(2014, 1, 1, tzinfo=timezone.utc))
+    self.assertEqual(_time('201401021530'), datetime(2014, 1, 2, 15, 30, tzinfo=timezone.utc))
+    self.assertEqual(_time('2014-01-02T15:30'), datetime(2014, 1, 2, 15, 30, tzinfo=timezone.utc))
@@ -0,0 +1,46 @@
+import unittest
+from ish_parser import ish_parser, read_columns, loads_columns
+from ish_parser.columnar import np, scaled
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class columnar_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300.txt'
+  OTHER_BUG = 'tests/723030-13714-1973'
+  NOAA = "0059035480999991943070124004+52467+000950FM-12+004699999V0200501N00461220001CN0040001N9+99999+99999999999ADDAY121999GA1001+999999999GF108991081051004501999999MW1051"
+
+  def test_matches_report_parser(self):
+    columns = read_columns(self.ORD_FILE)
+    reports = ish_parser().iter_file(self.ORD_FILE)
+    self.assertEqual(len(columns['datetime']), 4262)
+    for (index, report) in enumerate(reports):
+      if index % 97:
+        continue
+      self.assertEqual(columns['station'][index].decode(), report.weather_station)
+      self.assertEqual(columns['report_type'][index].decode(), report.report_type._obs_value)
+      self.assertEqual(columns['air_temperature'][index] / 10.0, report.air_temperature)
+      self.assertEqual(columns['wind_direction'][index], int(report.wind_direction._obs_value))
+      self.assertEqual(str(columns['datetime'][index]),
+                       report.datetime.strftime('%Y-%m-%dT%H:%M'))
+
+  def test_skips_bad_length(self):
+    self.assertEqual(len(read_columns(self.OTHER_BUG)['datetime']), 8580)
+
+  def test_2400_rolls_over(self):
+    columns = loads_columns(self.NOAA.encode())
+    self.assertEqual(str(columns['datetime'][0]), '1943-07-02T00:00')
+    self.assertEqual(columns['dew_point'][0], 9999)
+    self.assertEqual(columns['wind_speed_quality'][0], ord('1'))
+    self.assertAlmostEqual(scaled(columns, 'latitude')[0], 52.467, places=4)
+
+  def test_drops_impossible_dates(self):
+    # the same stamps timestamp.epoch_seconds rejects, plus a leap day
+    stamps = ['194302310000', '194302290000', '194304310000', '194307012430',
+              '194307011260', '194307010000', '194402290000']
+    data = '\n'.join(self.NOAA.replace('194307012400', stamp) for stamp in stamps).encode()
+    self.assertEqual([str(value) for value in loads_columns(data)['datetime']],
+                     ['1943-07-01T00:00', '1944-02-29T00:00'])
+
+  def test_crlf_and_no_trailing_newline(self):
+    data = (self.NOAA + '\r\n' + self.NOAA).encode()
+    self.assertEqual(len(loads_columns(data)['datetime']), 2)
@@ -0,0 +1,73 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from ish_parser import ish_parser, quarantine, write_csv
+from ish_parser.csv_export import csv_columns
+from .bad_lines import bad_component, read_lines, write_lines
+
+class csv_export_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+  KORD_FILE = 'tests/725300.txt'
+
+  def read(self, text):
+    return list(csv.reader(io.StringIO(text)))
+
+  def test_matches_reports(self):
+    columns = [('type', 'report_type'), 'datetime', 'air_temperature:fahrenheit', 'dew_point',
+               'wind_direction', 'wind_speed:mph', 'humidity', 'AA1', 'AA1.depth']
+    fh = io.StringIO()
+    self.assertEqual(write_csv(self.KORD_FILE, fh, columns), 4262)
+    rows = self.read(fh.getvalue())
+    self.assertEqual(rows[0], ['type'] + columns[1:])
+
+    blank = lambda value: '' if str(value) in ('MISSING', 'None') else str(value)
+    degrees = lambda value: '' if str(value) == 'MISSING' else str(int(value._obs_value))
+    for (row, report) in zip(rows[1:], ish_parser().iter_file(self.KORD_FILE)):
+      aa1 = report.get_additional_field('AA1')
+      self.assertEqual(row, [report.report_type._obs_value, report.datetime.isoformat(),
+                             blank(report.air_temperature.get_fahrenheit()),
+                             blank(report.dew_point), degrees(report.wind_direction),
+                             blank(report.wind_speed.get_MilesPerHour()),
+                             blank(report.humidity),
+                             blank(report.get_additional_text('AA1')),
+                             '' if aa1 is None else str(aa1.toJson()['depth'])])
+
+  def test_workers_and_filters(self):
+    paths = [self.ORD_FILE, self.KORD_FILE]
+    (serial, parallel) = (io.StringIO(), io.StringIO())
+    count = write_csv(paths, serial, report_types=['SY-SA', 'FM-15'])
+    self.assertEqual(write_csv(paths, parallel, workers=2, report_types=['SY-SA', 'FM-15']), count)
+    self.assertEqual(serial.getvalue(), parallel.getvalue())
+    self.assertEqual(len(self.read(serial.getvalue())), count + 1)
+
+  def test_reports_and_fields(self):
+    reports = list(ish_parser().iter_file(self.KORD_FILE))[:10]
+    fh = io.StringIO()
+    self.assertEqual(write_csv(reports, fh, ['weather_station'], header=False), 10)
+    self.assertEqual(fh.getvalue().split(), ['725300'] * 10)
+    self.assertEqual(csv_columns(['datetime', 'humidity', 'GA1.coverage']).fields,
+                     ['GA1', 'humidity', 'timestamp'])
+
+  def test_unknown_column(self):
+    self.assertRaises(ValueError, csv_columns, ['air_temperature:kelvin'])
+    self.assertRaises(ValueError, csv_columns, ['XX1'])
+
+  def test_bad_component_left_out(self):
+    lines = read_lines('tests/726430-14920-2015', 20)
+    lines[1] = bad_component(lines[1])
+    path = write_lines(os.path.join(tempfile.mkdtemp(), 'bad'), lines)
+    for chunk_size in (1, 8):
+      errors = quarantine()
+      parser = ish_parser(errors=errors)
+      fh = io.StringIO()
+      written = csv_columns(['datetime', 'GA1.base_height']).write(
+        csv.writer(fh), parser.iter_file(path), chunk_size, parser.reject)
+      self.assertEqual(written, 19)
+      self.assertEqual(len(fh.getvalue().splitlines()), 19)
+      self.assertEqual(dict(errors.reasons), {'bad_value': 1})
+    errors = quarantine()
+    self.assertEqual(write_csv(path, io.StringIO(), ['GA1.base_height'], errors=errors), 19)
+    self.assertEqual(len(errors), 1)
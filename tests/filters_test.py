@@ -0,0 +1,42 @@
+import unittest
+from datetime import datetime, timezone
+from ish_parser import ish_parser, line_filter
+
+class filters_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+  NOAA = "0059035480999991943070124004+52467+000950FM-12+004699999V0200501N00461220001CN0040001N9+99999+99999999999ADDAY121999GA1001+999999999GF108991081051004501999999MW1051"
+
+  def test_report_types(self):
+    reports = list(ish_parser(report_types=['SY-SA']).iter_file(self.ORD_FILE))
+    self.assertEqual(len(reports), 1294)
+    self.assertTrue(all(report.report_type == 'SY-SA' for report in reports))
+
+  def test_time_range(self):
+    start = datetime(1983, 7, 4, 12, tzinfo=timezone.utc)
+    end = datetime(1983, 7, 4, 18, tzinfo=timezone.utc)
+    for read in ('iter_file', 'iter_mapped'):
+      reports = list(getattr(ish_parser(start=start, end=end), read)(self.ORD_FILE))
+      self.assertEqual(len(reports), 6)
+      self.assertTrue(all(start <= report.datetime < end for report in reports))
+
+  def test_hour_2400_sorts_before_next_day(self):
+    self.assertTrue(line_filter(start='194307020000').accepts(self.NOAA))
+    self.assertFalse(line_filter(end='194307020000').accepts(self.NOAA))
+    self.assertTrue(line_filter(end='194307020001').accepts(self.NOAA.encode()))
+
+  def test_stations_and_box(self):
+    self.assertTrue(line_filter(stations=['035480']).accepts(self.NOAA))
+    self.assertTrue(line_filter(stations=['035480-99999']).accepts(self.NOAA))
+    self.assertFalse(line_filter(stations=['725300', '035480-12345']).accepts(self.NOAA))
+    self.assertTrue(line_filter(box=(52, 0, 53, 1)).accepts(self.NOAA))
+    self.assertFalse(line_filter(box=(50, 1, 53, 2)).accepts(self.NOAA))
+    self.assertEqual(len(list(ish_parser(stations=['725300']).iter_file(self.ORD_FILE))), 8760)
+    self.assertEqual(len(list(ish_parser(stations=['035480']).iter_file(self.ORD_FILE))), 0)
+
+  def test_box_across_antimeridian(self):
+    for line in (self.NOAA, self.NOAA.encode()):
+      self.assertTrue(line_filter(box=(52, 170, 53, 1)).accepts(line))
+      self.assertTrue(line_filter(box=(52, 0.95, 53, -170)).accepts(line))
+      self.assertFalse(line_filter(box=(52, 170, 53, -10)).accepts(line))
+      self.assertFalse(line_filter(box=(52, 1, 53, 0.5)).accepts(line))
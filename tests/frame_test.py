@@ -0,0 +1,48 @@
+import io
+import math
+import unittest
+from ish_parser import ish_parser
+from ish_parser.frame import pd
+from .bad_lines import bad_component, read_lines
+
+@unittest.skipIf(pd is None, 'pandas is not installed')
+class frame_test(unittest.TestCase):
+
+  RECURSIONBUG = 'tests/035480-99999-1943'
+
+  def setUp(self):
+    self.wf = ish_parser()
+    self.wf.load(self.RECURSIONBUG)
+
+  def test_columns_and_dtypes(self):
+    df = self.wf.to_dataframe(columns=['datetime', 'report_type', 'air_temperature'])
+    self.assertEqual(list(df.columns),
+                     ['datetime', 'report_type', 'air_temperature', 'air_temperature_quality'])
+    self.assertEqual(len(df), 4410)
+    self.assertEqual(str(df['datetime'].dt.tz), 'UTC')
+    self.assertEqual(df['report_type'].dtype.name, 'category')
+    self.assertEqual(df['air_temperature_quality'].dtype.name, 'category')
+
+  def test_missing_becomes_nan(self):
+    df = self.wf.to_dataframe()
+    report = self.wf.get_reports()[22]
+    self.assertTrue(math.isnan(df['air_temperature'][22]))
+    self.assertTrue(math.isnan(report.air_temperature.get_numeric()))
+    self.assertEqual(df['wind_speed'][22], report.wind_speed.get_numeric())
+    self.assertTrue(math.isnan(df['humidity'][22]))
+
+  def test_additional_columns(self):
+    df = self.wf.to_dataframe(columns=['datetime'], include_additional=['GA1', 'MW1'])
+    self.assertIn('GA1_coverage', df.columns)
+    self.assertEqual(df['GA1_coverage'].dtype.name, 'float64')
+    self.assertEqual(df['MW1'][22], self.wf.get_reports()[22].get_additional_field('MW1'))
+
+  def test_bad_component_is_missing(self):
+    lines = read_lines('tests/726430-14920-2015', 3)
+    lines[1] = bad_component(lines[1])
+    wf = ish_parser()
+    wf.load(io.StringIO('\n'.join(lines)))
+    df = wf.to_dataframe(columns=['datetime'], include_additional=['GA1'])
+    self.assertEqual(len(df), 3)
+    self.assertTrue(math.isnan(df['GA1_coverage'][1]))
+    self.assertFalse(math.isnan(df['GA1_coverage'][0]))
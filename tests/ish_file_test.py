@@ -0,0 +1,51 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import unittest
+from ish_parser import ish_parser, open_ish
+from ish_parser.ish_file import line_spans, map_file
+
+class ish_file_test(unittest.TestCase):
+
+  AT1_ERROR = 'tests/726430-14920-2015'
+
+  def setUp(self):
+    with open(self.AT1_ERROR, 'rb') as fp:
+      self.content = fp.read()
+
+  def _count(self, fileobj):
+    return sum(1 for report in ish_parser().iter_file(fileobj))
+
+  def test_plain_binary_file_object(self):
+    self.assertEqual(self._count(io.BytesIO(self.content)), 154)
+
+  def test_gzip(self):
+    self.assertEqual(self._count(io.BytesIO(gzip.compress(self.content))), 154)
+
+  def test_bz2(self):
+    self.assertEqual(self._count(io.BytesIO(bz2.compress(self.content))), 154)
+
+  def test_xz(self):
+    self.assertEqual(self._count(io.BytesIO(lzma.compress(self.content))), 154)
+
+  def test_file_object_left_open(self):
+    fileobj = io.BytesIO(gzip.compress(self.content))
+    with open_ish(fileobj) as fp:
+      fp.readline()
+    self.assertFalse(fileobj.closed)
+
+  def test_line_spans(self):
+    data = b'one\r\ntwo\n\nthree'
+    self.assertEqual([data[start:stop] for (start, stop) in line_spans(data)],
+                     [b'one', b'two', b'', b'three'])
+
+  def test_mapped_gzip_falls_back(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'station.gz')
+      with open(path, 'wb') as fp:
+        fp.write(gzip.compress(self.content))
+      self.assertIsNone(map_file(path))
+      self.assertEqual(sum(1 for report in ish_parser().iter_mapped(path)), 154)
@@ -83,3 +83,36 @@ class ish_parser_test(unittest.TestCase):
     self.assertEqual(len(wf.get_reports()), 4237)
     self.assertEqual(type(wf.get_reports()[10]), ish_report)
     self.assertEqual(len(wf.get_observations()), 3333)
+
+  def test_iter_file(self):
+    ''' streaming from a path yields the same reports as loads, and
+    nothing is kept on the parser '''
+    wf = ish_parser()
+    count = 0
+    for report in wf.iter_file(self.ORD_FILE):
+      self.assertEqual(type(report), ish_report)
+      count += 1
+    self.assertEqual(count, 4262)
+    self.assertEqual(len(wf.get_reports()), 0)
+
+  def test_iter_mapped(self):
+    ''' reports read through a memory map match the streamed ones, keep
+    no copy of the line, and still pickle '''
+    import pickle
+    streamed = list(ish_parser().iter_file(self.ORD_FILE))
+    for lazy in (False, True):
+      mapped = list(ish_parser(lazy).iter_mapped(self.ORD_FILE))
+      self.assertEqual(len(mapped), len(streamed))
+      self.assertIsNone(mapped[0]._raw)
+      for (one, other) in zip(mapped[::50], streamed[::50]):
+        self.assertEqual(one.raw, other.raw)
+        self.assertEqual(one.air_temperature, other.air_temperature)
+        self.assertEqual(one.additional().keys(), other.additional().keys())
+      copy = pickle.loads(pickle.dumps(mapped[-1]))
+      self.assertEqual(copy.raw, mapped[-1].raw)
+
+  def test_load_from_file_object(self):
+    wf = ish_parser()
+    with open(self.AT1_ERROR) as fp:
+      wf.load(fp)
+    self.assertEqual(len(wf.get_reports()), 154)
@@ -3,6 +3,7 @@ import datetime
 import pytz
 import math
 from ish_parser import ish_report, ish_reportException
+from .bad_lines import read_lines, unknown_code
 
 class ish_report_test(unittest.TestCase):
 
@@ -243,3 +244,77 @@ class ish_report_test(unittest.TestCase):
       self.assertEqual(ish.wind_speed.get_numeric(), 4.6)
       self.assertEqual(ish.visibility_distance.get_numeric(), 4000)
       self.assertEqual(ish.sky_ceiling.get_numeric(), 22000)
+
+  def test_additional_decoded_on_demand(self):
+    noaa_string = """0281725300948462014010508237+41995-087934FM-16+0205KORD V0303505N00625005795MN0020125N5-00565-00835999999ADDAA101000531AU110030015AW1715GA1025+003355991GA2085+005795991GD11991+0033559GD24991+0057959GE19MSL   +99999+99999GF199999990990003351991991MA1101665099215REMMET11601/05/14 02:23:02 SPECI KORD 050823Z 35012KT 1 1/4SM -SN FEW011 OVC019 M06/M08 A3002 RMK AO2 P0002 T10561083 $ (MJF)"""
+    weather = ish_report()
+    weather.loads(noaa_string)
+    self.assertFalse(weather._additional)
+    self.assertEqual(weather.get_additional_field('AA1').precipitation['hours'], 1)
+    self.assertEqual(list(weather._additional.keys()), ['AA1'])
+    self.assertEqual(list(weather.additional().keys()),
+                     ['AA1', 'AU1', 'AW1', 'GA1', 'GA2', 'GD1', 'GD2', 'GE1', 'GF1', 'MA1'])
+    self.assertEqual(weather.get_additional_field('GE1'), '9MSL   +99999+99999')
+    self.assertEqual(weather.get_additional_field('KA1'), None)
+
+  def test_unknown_additional_code(self):
+    noaa_string = """0029725300948462014010508237+41995-087934FM-16+0205KORD V0303505N00625005795MN0020125N5-00565-00835999999ADDAA101000531ZZ9101665099215"""
+    weather = ish_report(lazy=True).loads(noaa_string)
+    self.assertRaises(BaseException, weather.additional)
+    self.assertEqual(set(ish_report.DECODERS), set(ish_report.MAP))
+
+  def test_shared_report_types(self):
+    from ish_parser.Constant import Constant
+    noaa_string = """0014725300948462014010508237+41995-087934FM-16+0205KORD V0303505N00625005795MN0020125N5-00565-00835999999ADDAA101000531"""
+    first = ish_report().loads(noaa_string)
+    second = ish_report().loads(noaa_string)
+    self.assertIs(first.report_type, second.report_type)
+    self.assertIs(first.wind_direction, second.wind_direction)
+    self.assertIsNot(Constant.intern('1', None, '1', {'1': 'one'}),
+                     Constant.intern('1', None, '1', {'1': 'uno'}))
+
+  def test_compact(self):
+    noaa_string = """0281725300948462014010508237+41995-087934FM-16+0205KORD V0303505N00625005795MN0020125N5-00565-00835999999ADDAA101000531AU110030015AW1715GA1025+003355991GA2085+005795991GD11991+0033559GD24991+0057959GE19MSL   +99999+99999GF199999990990003351991991MA1101665099215REMMET11601/05/14 02:23:02 SPECI KORD 050823Z 35012KT 1 1/4SM -SN FEW011 OVC019 M06/M08 A3002 RMK AO2 P0002 T10561083 $ (MJF)"""
+    full = ish_report().loads(noaa_string)
+    compact = ish_report().loads(noaa_string, compact=True)
+    self.assertIsNone(compact.raw)
+    self.assertEqual(compact.air_temperature, full.air_temperature)
+    self.assertEqual(compact.datetime, full.datetime)
+    self.assertEqual(list(compact.additional().keys()), list(full.additional().keys()))
+    self.assertEqual(compact.get_additional_field('AA1').precipitation['hours'], 1)
+    self.assertEqual(compact.get_additional_field('KA1'), None)
+    self.assertEqual(compact.get_additional_text('GE1'), '9MSL   +99999+99999')
+    self.assertEqual(dict(compact.remarks()), full.remarks())
+    self.assertEqual(len(compact.present_weather), 1)
+
+  def test_fields(self):
+    noaa_string = """0281725300948462014010508237+41995-087934FM-16+0205KORD V0303505N00625005795MN0020125N5-00565-00835999999ADDAA101000531AU110030015AW1715GA1025+003355991GA2085+005795991GD11991+0033559GD24991+0057959GE19MSL   +99999+99999GF199999990990003351991991MA1101665099215REMMET11601/05/14 02:23:02 SPECI KORD 050823Z 35012KT 1 1/4SM -SN FEW011 OVC019 M06/M08 A3002 RMK AO2 P0002 T10561083 $ (MJF)"""
+    weather = ish_report().loads(noaa_string, fields=['datetime', 'air_temperature', 'AU1'])
+    self.assertEqual(weather._air_temperature, -5.6)
+    self.assertRaises(AttributeError, getattr, weather, '_dew_point')
+    self.assertEqual(list(weather._additional_offsets.keys()), ['AA1', 'AU1'])
+    self.assertIsNone(weather._remarks)
+    self.assertEqual(weather.dew_point, -8.3)
+    self.assertEqual(weather.get_additional_text('GE1'), '9MSL   +99999+99999')
+    self.assertEqual(len(weather.additional()), 10)
+    self.assertRaises(ValueError, ish_report.project, ['AA1', 'XX9'])
+    # a walk that already reached the end hands back what it found
+    self.assertEqual(len(weather._scan_additional()), 10)
+
+  def test_getattr_without_additional(self):
+    self.assertFalse(hasattr(ish_report(), 'precipitation'))
+    line = unknown_code(read_lines('tests/726430-14920-2015', 1)[0])
+    lazy = ish_report(lazy=True).loads(line)
+    self.assertEqual(getattr(lazy, 'precipitation', 'missing'), 'missing')
+    self.assertRaises(ish_reportException, lazy.additional)
+
+  def test_lazy_mandatory_fields(self):
+    noaa_string = """0250725300948462014010100517+41995-087934FM-15+0205KORD V0302505N00155005795MN0024145N5-01115-01445102735ADDAA101000895AU110030015AW1715GA1085+005795991GD14991+0057959GE19MSL   +99999+99999GF199999990990005791991991MA1102575100115REMMET11612/31/13 18:51:03 METAR KORD 010051Z 25003KT 1 1/2SM -SN OVC019 M11/M14 A3029 RMK AO2 SLP273 P0003 T11111144 $ (KLC)"""
+    eager = ish_report().loads(noaa_string)
+    lazy = ish_report(lazy=True).loads(noaa_string)
+    self.assertFalse(hasattr(lazy, '__dict__'))
+    self.assertRaises(AttributeError, getattr, lazy, '_air_temperature')
+    for field in ish_report.MANDATORY_FIELDS:
+      self.assertEqual(str(getattr(lazy, field.name)), str(getattr(eager, field.name)))
+    self.assertEqual(lazy._air_temperature, -11.1)
+    self.assertEqual(lazy.humidity, 77)
@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from ish_parser import ish_parser, quarantine, write_ndjson
+from ish_parser.ndjson import orjson
+from .bad_lines import bad_component, read_lines, unknown_code, write_lines
+
+class ndjson_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+  NAN_FILE = 'tests/035480-99999-1943'
+
+  def test_same_as_to_json(self):
+    reports = list(ish_parser().iter_file(self.ORD_FILE))
+    fh = io.StringIO()
+    self.assertEqual(write_ndjson(reports, fh, backend='json'), len(reports))
+    self.assertEqual(fh.getvalue(), ''.join(report.toJson() + '\n' for report in reports))
+
+  def test_path_and_binary_file(self):
+    path = os.path.join(tempfile.mkdtemp(), 'out.json')
+    with open(path, 'wb') as fh:
+      count = write_ndjson(self.ORD_FILE, fh, backend='json', report_types=['SY-SA'])
+    with open(path) as fh:
+      lines = fh.read().splitlines()
+    self.assertEqual(count, 1294)
+    self.assertEqual(len(lines), count)
+    self.assertEqual(json.loads(lines[0])['weather_station'], '725300')
+
+  @unittest.skipIf(orjson is None, 'orjson is not installed')
+  def test_orjson(self):
+    reports = list(ish_parser().iter_file(self.NAN_FILE))
+    fh = io.BytesIO()
+    write_ndjson(reports, fh, backend='orjson')
+    # orjson writes NaN as null
+    def expected(report):
+      return json.loads(report.toJson(), parse_constant=lambda name: None)
+    for (line, report) in zip(fh.getvalue().splitlines(), reports):
+      self.assertEqual(json.loads(line), expected(report))
+
+  def test_unknown_backend(self):
+    self.assertRaises(ValueError, write_ndjson, [], io.StringIO(), backend='yaml')
+
+  def test_bad_reports_left_out(self):
+    lines = read_lines('tests/726430-14920-2015', 20)
+    lines[1] = bad_component(lines[1])
+    lines[2] = unknown_code(lines[2])
+    path = write_lines(os.path.join(tempfile.mkdtemp(), 'bad'), lines)
+    errors = quarantine()
+    fh = io.StringIO()
+    self.assertEqual(write_ndjson(path, fh, 'json', errors=errors), 18)
+    self.assertEqual(len(fh.getvalue().splitlines()), 18)
+    self.assertEqual([(line.reason, line.offset) for line in errors.lines],
+                     [('bad_value', len(lines[0]) + 1), ('unknown_code', len(lines[0]) + len(lines[1]) + 2)])
+    # reports handed in
+    errors = quarantine()
+    reports = list(ish_parser().iter_reports(lines))
+    self.assertEqual(write_ndjson(reports, io.StringIO(), 'json', errors=errors), 18)
+    self.assertEqual(dict(errors.reasons), {'bad_value': 1})
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ish_parser import ish_parser, ish_report, quarantine
+from ish_parser.parquet import pa, write_parquet, read_dataset
+from .bad_lines import bad_component, read_lines, unknown_code, write_lines
+
+@unittest.skipIf(pa is None, 'pyarrow is not installed')
+class parquet_test(unittest.TestCase):
+
+  OTHER_RANDOM = 'tests/010060-99999-2014'
+  AT1_ERROR = 'tests/726430-14920-2015'
+
+  def setUp(self):
+    self.root = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.root)
+
+  def test_partitioned_round_trip(self):
+    self.assertEqual(write_parquet(self.OTHER_RANDOM, self.root, batch_size=500), 2816)
+    self.assertEqual(write_parquet(self.AT1_ERROR, self.root), 154)
+    table = read_dataset(self.root).to_table()
+    self.assertEqual(table.num_rows, 2970)
+    self.assertEqual(sorted(set(table.column('station').to_pylist())), ['010060', '726430'])
+    self.assertTrue(pa.types.is_dictionary(table.schema.field('report_type').type))
+
+  def test_repeated_groups(self):
+    write_parquet(self.AT1_ERROR, self.root)
+    rows = read_dataset(self.root).to_table().to_pylist()
+    with_precip = [row for row in rows if row['liquid_precip']]
+    self.assertTrue(with_precip)
+    self.assertEqual(set(with_precip[0]['liquid_precip'][0].keys()), set(['hours', 'depth']))
+
+  def test_appending_adds_part_files(self):
+    write_parquet(self.AT1_ERROR, self.root)
+    write_parquet(self.AT1_ERROR, self.root)
+    self.assertEqual(read_dataset(self.root).to_table().num_rows, 308)
+
+  def test_bad_line_is_left_out(self):
+    lines = read_lines(self.AT1_ERROR)
+    for breaks in (unknown_code, bad_component):
+      path = write_lines(os.path.join(self.root, 'bad'), lines[:1] + [breaks(lines[1])] + lines[2:])
+      errors = quarantine()
+      out = os.path.join(self.root, breaks.__name__)
+      self.assertEqual(write_parquet(path, out, errors=errors), 153)
+      self.assertEqual(read_dataset(out).to_table().num_rows, 153)
+      (rejected,) = errors.lines
+      self.assertEqual((rejected.source, rejected.offset), (path, len(lines[0]) + 1))
+
+  def test_bad_report_leaves_the_partition_alone(self):
+    reports = list(ish_parser(lazy=True).iter_reports(read_lines(self.AT1_ERROR)))
+    reports[1] = ish_report().loads(bad_component(reports[1].raw))
+    errors = quarantine()
+    self.assertEqual(write_parquet(reports, self.root, errors=errors), 153)
+    self.assertEqual(read_dataset(self.root).to_table().num_rows, 153)
+    self.assertEqual(dict(errors.reasons), {'bad_value': 1})
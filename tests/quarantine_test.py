@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+from ish_parser import ish_parser, ish_report, ish_reportException, quarantine, ErrorBudgetExceeded
+from .bad_lines import bad_component, read_lines
+
+class quarantine_test(unittest.TestCase):
+
+  BAD_FILE = 'tests/723030-13714-1973'
+  NOAA = "0059035480999991943070124004+52467+000950FM-12+004699999V0200501N00461220001CN0040001N9+99999+99999999999ADDAY121999GA1001+999999999GF108991081051004501999999MW1051"
+
+  def test_offsets(self):
+    with open(self.BAD_FILE, 'rb') as fp:
+      content = fp.read()
+    for read in ('iter_file', 'iter_mapped'):
+      parser = ish_parser()
+      reports = list(getattr(parser, read)(self.BAD_FILE))
+      self.assertEqual(len(reports), 8580)
+      errors = parser.get_errors()
+      self.assertEqual(len(errors), 1)
+      self.assertEqual(dict(errors.reasons), {'length': 1})
+      rejected = errors.lines[0]
+      self.assertEqual(rejected.source, self.BAD_FILE)
+      self.assertTrue(content[rejected.offset:].startswith(rejected.line.encode()))
+
+  def test_offsets_crlf(self):
+    with open(self.BAD_FILE, 'rb') as fp:
+      content = fp.read().replace(b'\n', b'\r\n')
+    path = os.path.join(tempfile.mkdtemp(), 'crlf')
+    with open(path, 'wb') as fp:
+      fp.write(content)
+    for read in ('iter_file', 'iter_mapped'):
+      parser = ish_parser()
+      self.assertEqual(len(list(getattr(parser, read)(path))), 8580)
+      rejected = parser.get_errors().lines[0]
+      self.assertTrue(content[rejected.offset:].startswith(rejected.line.encode()))
+
+  def test_reasons(self):
+    errors = quarantine()
+    unknown = self.NOAA[:-7] + 'XX1051'
+    unknown = '%04d' % (len(unknown) - ish_report.PREAMBLE_LENGTH) + unknown[4:]
+    lines = [self.NOAA, self.NOAA[:-1], unknown, self.NOAA.replace('1943070124', '1943079924')]
+    reports = list(ish_parser(errors=errors).iter_reports(lines, 'lines'))
+    self.assertEqual(len(reports), 1)
+    self.assertEqual([line.reason for line in errors.lines], ['length', 'unknown_code', 'bad_value'])
+    self.assertEqual([line.offset for line in errors.lines],
+                     [len(self.NOAA), 2 * len(self.NOAA) - 1, 2 * len(self.NOAA) - 1 + len(unknown)])
+
+  def test_file_and_budget(self):
+    path = os.path.join(tempfile.mkdtemp(), 'rejected.jsonl')
+    lines = [self.NOAA[:-1]] * 5
+    with quarantine(path, max_lines=2, max_errors=3) as errors:
+      parser = ish_parser(errors=errors)
+      self.assertRaises(ErrorBudgetExceeded, list, parser.iter_reports(lines))
+    self.assertEqual(len(errors.lines), 2)
+    self.assertEqual(errors.total, 4)
+    with open(path) as fp:
+      written = [json.loads(line) for line in fp]
+    self.assertEqual(len(written), 4)
+    self.assertEqual(written[3]['offset'], 3 * (len(self.NOAA) - 1))
+
+  def test_remarks_without_rem(self):
+    weather = ish_report().loads(self.NOAA)
+    self.assertEqual(weather.remarks(), {})
+    self.assertRaises(ish_reportException, weather._get_remarks_component, self.NOAA, 105)
+
+  def test_exception_is_an_exception(self):
+    # so the except Exception boundaries in bulk, aio and the cli catch it
+    self.assertTrue(issubclass(ish_reportException, Exception))
+
+  def test_bad_component(self):
+    # the additional fields are built on first use, so the line loads and
+    # the decode error comes later. reject puts it in the quarantine
+    lines = read_lines('tests/726430-14920-2015', 3)
+    lines[1] = bad_component(lines[1])
+    parser = ish_parser()
+    reports = []
+    for report in parser.iter_reports(lines, 'lines'):
+      try:
+        report.additional()
+      except Exception as exp:
+        parser.reject(report, exp)
+        continue
+      reports.append(report)
+    self.assertEqual(len(reports), 2)
+    (rejected,) = parser.get_errors().lines
+    self.assertEqual((rejected.source, rejected.offset, rejected.reason),
+                     ('lines', len(lines[0]), 'bad_value'))
+    self.assertEqual(rejected.line, lines[1])
@@ -0,0 +1,38 @@
+import unittest
+from ish_parser import ish_parser, parse_stats
+
+class stats_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+
+  def test_counts(self):
+    stats = parse_stats()
+    reports = list(ish_parser(stats=stats, report_types=['SAO']).iter_file(self.ORD_FILE))
+    self.assertEqual(stats.reports, len(reports))
+    self.assertEqual(stats.lines, stats.reports + sum(stats.rejected.values()))
+    self.assertGreater(stats.rejected['filtered'], 0)
+    self.assertGreater(stats.bytes, 0)
+    self.assertEqual(stats.codes['AA1'], sum(1 for report in reports
+                                             if 'AA1' in report.additional_codes()))
+    self.assertGreater(stats.seconds['timestamp'], 0)
+    self.assertGreater(stats.seconds['additional'], 0)
+    self.assertEqual(stats.seconds['components'], 0)
+
+  def test_decode_all_and_mapped(self):
+    stats = parse_stats(decode_all=True)
+    reports = list(ish_parser(stats=stats).iter_mapped(self.ORD_FILE))
+    self.assertEqual(stats.reports, len(reports))
+    self.assertGreater(stats.seconds['components'], 0)
+    self.assertEqual(set(stats.code_seconds), set(stats.codes))
+    self.assertAlmostEqual(sum(stats.code_seconds.values()), stats.seconds['components'])
+
+  def test_rejected_and_callback(self):
+    seen = []
+    stats = parse_stats(callback=lambda stats: seen.append(stats.lines), interval=2)
+    parser = ish_parser(stats=stats)
+    parser.loads('short\n0999' + 'x' * 200 + '\n')
+    self.assertEqual(stats.rejected['short'], 1)
+    self.assertEqual(stats.rejected['length'], 1)
+    self.assertEqual(seen, [2])
+    self.assertEqual(stats.as_dict()['reports'], 0)
+    self.assertEqual(parse_stats().merge(stats).lines, 2)
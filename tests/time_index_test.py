@@ -0,0 +1,54 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from ish_parser import ish_parser
+from ish_parser.time_index import build_index, read_index
+
+class time_index_test(unittest.TestCase):
+
+  ORD_FILE = 'tests/725300-94846-1983'
+  START = datetime(1983, 7, 4, 12, tzinfo=timezone.utc)
+  END = datetime(1983, 7, 4, 18, tzinfo=timezone.utc)
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, 'station')
+    shutil.copy(self.ORD_FILE, self.path)
+    self.expected = [report.raw for report in
+                     ish_parser(start=self.START, end=self.END).iter_file(self.ORD_FILE)]
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def _range(self, path, start=START, end=END):
+    return [report.raw for report in ish_parser().read_range(path, start, end)]
+
+  def test_bisect_without_index(self):
+    self.assertEqual(len(self.expected), 6)
+    self.assertEqual(self._range(self.path), self.expected)
+    self.assertEqual(len(self._range(self.path, None, '198301010300')), 3)
+    self.assertEqual(len(self._range(self.path, '198312312200', None)), 2)
+
+  def test_with_index(self):
+    for every in (1, 50):
+      build_index(self.path, every)
+      (minutes, offsets) = read_index(self.path)
+      self.assertEqual(len(minutes), len(offsets))
+      self.assertEqual(self._range(self.path), self.expected)
+
+  def test_stale_index_ignored(self):
+    build_index(self.path)
+    with open(self.path, 'ab') as fp:
+      fp.write(b'\n')
+    self.assertIsNone(read_index(self.path))
+    self.assertEqual(self._range(self.path), self.expected)
+
+  def test_compressed(self):
+    path = self.path + '.gz'
+    with open(self.ORD_FILE, 'rb') as source, gzip.open(path, 'wb') as fp:
+      fp.write(source.read())
+    self.assertEqual(self._range(path), self.expected)
+    self.assertRaises(ValueError, build_index, path)
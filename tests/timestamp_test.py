@@ -0,0 +1,29 @@
+import unittest
+from datetime import datetime, timezone
+from ish_parser import ish_report
+from ish_parser.timestamp import epoch_seconds, to_datetime
+
+class timestamp_test(unittest.TestCase):
+
+  NOAA = "0059035480999991943070124004+52467+000950FM-12+004699999V0200501N00461220001CN0040001N9+99999+99999999999ADDAY121999GA1001+999999999GF108991081051004501999999MW1051"
+
+  def test_matches_strptime(self):
+    for stamp in ('197001010000', '201602290000', '201412312359', '190101010101'):
+      expected = datetime.strptime(stamp, '%Y%m%d%H%M').replace(tzinfo=timezone.utc)
+      self.assertEqual(to_datetime(epoch_seconds(stamp)), expected)
+
+  def test_2400_rolls_over(self):
+    self.assertEqual(epoch_seconds('201412312400'), epoch_seconds('201501010000'))
+    report = ish_report().loads(self.NOAA)
+    self.assertEqual(report.datetime, datetime(1943, 7, 2, tzinfo=timezone.utc))
+    self.assertEqual(report.timestamp, int(report.datetime.timestamp()))
+
+  def test_invalid(self):
+    for stamp in ('201413010000', '201402300000', '201401012500', '201401012430', '20140101AB00'):
+      with self.assertRaises(ValueError):
+        epoch_seconds(stamp)
+
+  def test_before_1970(self):
+    seconds = epoch_seconds('194307020000')
+    self.assertTrue(seconds < 0)
+    self.assertEqual(to_datetime(seconds), datetime(1943, 7, 2, tzinfo=timezone.utc))